@@ -0,0 +1,112 @@
+"""add search vectors
+
+Revision ID: 01144a4186c1
+Revises: af5064ef4470
+Create Date: 2026-10-17 16:02:44.918305
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '01144a4186c1'
+down_revision = 'af5064ef4470'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+# table -> (columns the vector depends on, expression over NEW)
+SEARCH_VECTORS = {
+    "ticket": (
+        "title, description",
+        "setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B')",
+    ),
+    "message": ("content", "to_tsvector('english', coalesce(NEW.content, ''))"),
+}
+
+
+def _backfill(table, expression):
+    # Short batches in their own transactions, walking the primary key, so
+    # no row lock is held for long and each batch reads only its own rows.
+    expression = expression.replace("NEW.", "")
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE {table} SET search_vector = {expression}")
+        return
+    stmt = sa.text(
+        f"UPDATE {table} SET search_vector = {expression} "
+        f"WHERE id IN (SELECT id FROM {table} WHERE id > :after "
+        f"ORDER BY id LIMIT {BACKFILL_BATCH_SIZE}) RETURNING id"
+    )
+    after = uuid.UUID(int=0)
+    bind = op.get_bind()
+    while True:
+        ids = bind.execute(stmt, {"after": after}).scalars().all()
+        if not ids:
+            break
+        after = max(ids)
+
+
+def upgrade():
+    # Plain nullable columns kept up to date by triggers. A STORED generated
+    # column would rewrite both tables under an ACCESS EXCLUSIVE lock; these
+    # only hold it for a catalog change, and give up rather than queue behind
+    # long transactions (and block everything queued behind them).
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    for table, (columns, expression) in SEARCH_VECTORS.items():
+        op.add_column(table, sa.Column("search_vector", postgresql.TSVECTOR()))
+        name = f"{table}_search_vector_update"
+        op.execute(
+            f"CREATE FUNCTION {name}() RETURNS trigger AS $$ "
+            f"BEGIN NEW.search_vector := {expression}; RETURN NEW; END "
+            "$$ LANGUAGE plpgsql"
+        )
+        op.execute(
+            f"CREATE TRIGGER {name} BEFORE INSERT OR UPDATE OF {columns} "
+            f"ON {table} FOR EACH ROW EXECUTE FUNCTION {name}()"
+        )
+
+    # New writes are covered by the triggers from here on. Existing rows are
+    # backfilled, and the indexes built without blocking writes, outside the
+    # migration's transaction.
+    with op.get_context().autocommit_block():
+        for table, (_, expression) in SEARCH_VECTORS.items():
+            _backfill(table, expression)
+        op.create_index(
+            "ix_ticket_search_vector",
+            "ticket",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_message_search_vector",
+            "message",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_message_search_vector",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_ticket_search_vector",
+            table_name="ticket",
+            postgresql_concurrently=True,
+        )
+    for table in SEARCH_VECTORS:
+        name = f"{table}_search_vector_update"
+        op.execute(f"DROP TRIGGER {name} ON {table}")
+        op.execute(f"DROP FUNCTION {name}()")
+        op.drop_column(table, "search_vector")
@@ -0,0 +1,28 @@
+"""add message ticket keyset index
+
+Revision ID: 1edcf21addd9
+Revises: 9ea7298fac5f
+Create Date: 2026-10-17 14:37:09.204517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1edcf21addd9'
+down_revision = '9ea7298fac5f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_message_ticket_id_created_at_id",
+        "message",
+        ["ticket_id", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_message_ticket_id_created_at_id", table_name="message")
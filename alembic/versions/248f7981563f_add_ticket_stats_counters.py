@@ -0,0 +1,127 @@
+"""add ticket stats counters
+
+Revision ID: 248f7981563f
+Revises: 01144a4186c1
+Create Date: 2026-10-17 17:12:36.204518
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '248f7981563f'
+down_revision = '01144a4186c1'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+FIRST_RESPONSE_AT = (
+    "first_response_at = (SELECT min(created_at) FROM message "
+    "WHERE message.ticket_id = ticket.id AND message.is_ai)"
+)
+
+
+def _user_id_column():
+    return sa.Column(
+        "user_id",
+        postgresql.UUID(as_uuid=True),
+        sa.ForeignKey("user.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+
+def _backfill_first_response_at():
+    # Short batches in their own transactions, walking the primary key, so
+    # no row lock on ticket is held for long.
+    if op.get_context().as_sql:
+        op.execute(f"UPDATE ticket SET {FIRST_RESPONSE_AT}")
+        return
+    stmt = sa.text(
+        f"UPDATE ticket SET {FIRST_RESPONSE_AT} "
+        "WHERE id IN (SELECT id FROM ticket WHERE id > :after "
+        f"ORDER BY id LIMIT {BACKFILL_BATCH_SIZE}) RETURNING id"
+    )
+    after = uuid.UUID(int=0)
+    bind = op.get_bind()
+    while True:
+        ids = bind.execute(stmt, {"after": after}).scalars().all()
+        if not ids:
+            break
+        after = max(ids)
+
+
+def upgrade():
+    op.add_column("ticket", sa.Column("first_response_at", sa.DateTime(), nullable=True))
+    op.create_table(
+        "ticket_status_count",
+        _user_id_column(),
+        sa.Column("status", sa.String(), primary_key=True),
+        sa.Column("created_on", sa.Date(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "ticket_reply_count",
+        _user_id_column(),
+        sa.Column("ai_messages", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("human_messages", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "first_response_count",
+        _user_id_column(),
+        sa.Column("bucket", sa.Integer(), primary_key=True),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    # Backfill from the existing rows; the same as
+    # TicketStatsRepository.reconcile, with its buckets spelled out. The
+    # counters are built after the batches, in the migration's transaction.
+    with op.get_context().autocommit_block():
+        _backfill_first_response_at()
+    op.execute(
+        """
+        INSERT INTO ticket_status_count (user_id, status, created_on, count)
+        SELECT user_id, status, CAST(created_at AS date), count(*)
+        FROM ticket
+        WHERE user_id IS NOT NULL AND status IS NOT NULL
+        GROUP BY user_id, status, CAST(created_at AS date)
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO ticket_reply_count (user_id, ai_messages, human_messages)
+        SELECT ticket.user_id,
+               count(*) FILTER (WHERE message.is_ai IS true),
+               count(*) FILTER (WHERE message.is_ai IS NOT true)
+        FROM message JOIN ticket ON ticket.id = message.ticket_id
+        WHERE ticket.user_id IS NOT NULL
+        GROUP BY ticket.user_id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO first_response_count (user_id, bucket, count)
+        SELECT user_id, bucket, count(*)
+        FROM (
+            SELECT user_id,
+                   width_bucket(
+                       extract(epoch FROM first_response_at - created_at),
+                       ARRAY[10, 30, 60, 300, 900, 3600, 14400, 86400]::numeric[]
+                   ) AS bucket
+            FROM ticket
+            WHERE user_id IS NOT NULL AND first_response_at IS NOT NULL
+        ) AS responses
+        GROUP BY user_id, bucket
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("first_response_count")
+    op.drop_table("ticket_reply_count")
+    op.drop_table("ticket_status_count")
+    op.drop_column("ticket", "first_response_at")
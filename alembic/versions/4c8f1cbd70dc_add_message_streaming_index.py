@@ -0,0 +1,38 @@
+"""add message streaming index
+
+Revision ID: 4c8f1cbd70dc
+Revises: 248f7981563f
+Create Date: 2026-10-17 21:48:15.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c8f1cbd70dc'
+down_revision = '248f7981563f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built concurrently so message writes carry on meanwhile; CREATE INDEX
+    # CONCURRENTLY cannot run inside a transaction.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_message_streaming_updated_at",
+            "message",
+            ["updated_at"],
+            postgresql_where=sa.text("status = 'streaming'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_message_streaming_updated_at",
+            table_name="message",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,36 @@
+"""add ticket keyset indexes
+
+Revision ID: 9aa34d243aee
+Revises: 
+Create Date: 2026-10-17 09:12:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9aa34d243aee'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_ticket_created_at_id", "ticket", ["created_at", "id"]
+    )
+    op.create_index(
+        "ix_ticket_user_id_created_at_id", "ticket", ["user_id", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_ticket_user_id_status_created_at_id",
+        "ticket",
+        ["user_id", "status", "created_at", "id"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ticket_user_id_status_created_at_id", table_name="ticket")
+    op.drop_index("ix_ticket_user_id_created_at_id", table_name="ticket")
+    op.drop_index("ix_ticket_created_at_id", table_name="ticket")
@@ -0,0 +1,27 @@
+"""add message status
+
+Revision ID: 9ea7298fac5f
+Revises: 9aa34d243aee
+Create Date: 2026-10-17 11:04:52.671930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9ea7298fac5f'
+down_revision = '9aa34d243aee'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "message",
+        sa.Column("status", sa.String(), nullable=True, server_default="complete"),
+    )
+
+
+def downgrade():
+    op.drop_column("message", "status")
@@ -0,0 +1,53 @@
+"""add ai job table
+
+Revision ID: af5064ef4470
+Revises: 1edcf21addd9
+Create Date: 2026-10-17 15:21:08.417730
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'af5064ef4470'
+down_revision = '1edcf21addd9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ai_job",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column(
+            "ticket_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("ticket.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("user.id")),
+        sa.Column("status", sa.String(), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("webhook_url", sa.String(), nullable=True),
+        sa.Column(
+            "result_message_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("message.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("locked_until", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_ai_job_status_created_at", "ai_job", ["status", "created_at"])
+    op.create_index("ix_ai_job_ticket_id_status", "ai_job", ["ticket_id", "status"])
+
+
+def downgrade():
+    op.drop_index("ix_ai_job_ticket_id_status", table_name="ai_job")
+    op.drop_index("ix_ai_job_status_created_at", table_name="ai_job")
+    op.drop_table("ai_job")
@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, tickets
+from app.api.routes import auth, metrics, tickets
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(tickets.router, prefix="/tickets", tags=["tickets"])
\ No newline at end of file
+api_router.include_router(tickets.router, prefix="/tickets", tags=["tickets"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -4,10 +4,11 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.schemas.user import Token, User, UserCreate
 from app.core.dependencies import get_auth_service
+from app.core.instrumentation import InstrumentedRoute
 from app.db.base import get_db
 from app.services.auth_service import AuthService
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
 
 
 @router.post("/signup", response_model=User, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,40 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends
+
+from app.core.dependencies import get_admin_user, get_generation_scheduler
+from app.core.instrumentation import InstrumentedRoute
+from app.core.security import password_hasher
+from app.db.base import engine
+from app.db.pool import pool_stats
+from app.services.generation_scheduler import GenerationScheduler
+
+router = APIRouter(
+    route_class=InstrumentedRoute, dependencies=[Depends(get_admin_user)]
+)
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics() -> Dict[str, Any]:
+    """
+    Live database connection pool usage: checkouts, overflow and wait times.
+    """
+    return pool_stats(engine.sync_engine)
+
+
+@router.get("/password-hashing")
+async def get_password_hashing_metrics() -> Dict[str, Any]:
+    """
+    Password hashing worker pool usage and queue depth.
+    """
+    return password_hasher.stats()
+
+
+@router.get("/ai-scheduler")
+async def get_ai_scheduler_metrics(
+    scheduler: GenerationScheduler = Depends(get_generation_scheduler),
+) -> Dict[str, Any]:
+    """
+    AI generation admission: active generations, queue depth and wait times.
+    """
+    return scheduler.stats()
@@ -1,44 +1,97 @@
-from typing import List
+from datetime import datetime
+from typing import List, Literal, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Header, Query, Response, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.schemas.ai_job import AIJob, AIJobCreate
 from app.api.schemas.ticket import (
+    BulkItemResult,
     Message,
+    MessageBulkCreate,
     MessageCreate,
     Ticket,
+    TicketBulkUpdate,
     TicketCreate,
+    TicketSearchResult,
+    TicketStats,
     TicketUpdate,
     TicketWithMessages,
 )
-from app.core.dependencies import get_current_active_user
-from app.db.base import get_db
-from app.db.models import User
-from app.services.ai_service import AIService
+from app.core.config import settings
+from app.core.dependencies import (
+    get_admin_user,
+    get_ai_service,
+    get_current_active_user,
+    get_generation_scheduler,
+    get_reply_broadcaster,
+)
+from app.core.etag import etag_matches
+from app.core.instrumentation import InstrumentedRoute, timed
+from app.core.responses import ORJSONResponse
+from app.core.sse import SSE_HEADERS, encode_stream
+from app.core.user_cache import UserPrincipal
+from app.db.base import SessionLocal, get_db
+from app.services.ai_job_service import AIJobService
+from app.services.ai_service import AIService, build_reply_prompt
+from app.services.generation_scheduler import GenerationScheduler
+from app.services.stream_broadcaster import StreamBroadcaster
+from app.services.stream_recorder import StreamRecorder
+from app.services.ticket_export import EXPORT_MEDIA_TYPES
 from app.services.ticket_service import TicketService
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedRoute)
+
+# Polled views are cached per user and revalidated with If-None-Match on
+# every use.
+REVALIDATE = "private, no-cache"
 
 
-@router.get("/", response_model=List[Ticket])
+def _not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE},
+    )
+
+
+@router.get("/", response_model=List[Ticket], response_class=ORJSONResponse)
 async def get_tickets(
-    current_user: User = Depends(get_current_active_user),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get all tickets for the current user.
+    Get tickets for the current user, newest first.
+
+    Results are paginated; when more tickets exist, the opaque cursor for the
+    next page is returned in the `X-Next-Cursor` header.
     """
     ticket_service = TicketService(db)
-    tickets = await ticket_service.get_user_tickets(user=current_user)
-    return tickets
+    tickets, next_cursor = await ticket_service.get_user_tickets(
+        user=current_user,
+        status=status_filter,
+        created_after=created_after,
+        created_before=created_before,
+        cursor=cursor,
+        limit=limit,
+    )
+    with timed("serialize"):
+        response = ORJSONResponse(tickets)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 
 @router.post("/", response_model=Ticket, status_code=status.HTTP_201_CREATED)
 async def create_ticket(
     ticket_in: TicketCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -49,27 +102,159 @@ async def create_ticket(
     return ticket
 
 
-@router.get("/{ticket_id}", response_model=TicketWithMessages)
+@router.post("/bulk/status", response_model=List[BulkItemResult])
+async def bulk_update_tickets(
+    bulk: TicketBulkUpdate,
+    current_user: UserPrincipal = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Set the status and/or owner of many tickets at once (admin only).
+
+    Runs as a single UPDATE in one transaction; the result lists every
+    ticket id with whether it was updated.
+    """
+    ticket_service = TicketService(db)
+    return await ticket_service.bulk_update_tickets(bulk)
+
+
+@router.post("/bulk/messages", response_model=List[BulkItemResult])
+async def bulk_add_messages(
+    bulk: MessageBulkCreate,
+    current_user: UserPrincipal = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Add many messages, across any tickets, in one transaction (admin only).
+
+    Results are in request order; messages for missing tickets are skipped.
+    """
+    ticket_service = TicketService(db)
+    return await ticket_service.bulk_add_messages(bulk)
+
+
+@router.get("/export")
+async def export_tickets(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    user_id: Optional[UUID] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: UserPrincipal = Depends(get_current_active_user),
+):
+    """
+    Stream tickets with their full conversations as NDJSON or CSV.
+
+    NDJSON has one ticket per line with its messages nested; CSV has one row
+    per message. Admins export every ticket (optionally one `user_id`'s),
+    other users their own. Rows are read through a server-side cursor, so
+    the export size does not affect memory use.
+    """
+    async def export():
+        # Own session: the export outlives the request's dependencies.
+        async with SessionLocal() as session:
+            ticket_service = TicketService(session)
+            async for chunk in ticket_service.export_tickets(
+                user=current_user,
+                export_format=export_format,
+                user_id=user_id,
+                status=status_filter,
+                created_after=created_after,
+                created_before=created_before,
+            ):
+                yield chunk
+
+    return StreamingResponse(
+        content=export(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tickets.{export_format}"'},
+    )
+
+
+@router.get("/search", response_model=List[TicketSearchResult])
+async def search_tickets(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Full-text search over ticket titles, descriptions and messages.
+
+    Accepts web-search syntax ("quoted phrases", -excluded, or). Results are
+    ranked best first, with the matching text highlighted in `snippet`;
+    admins search every ticket, other users only their own. The cursor for
+    the next page is returned in the `X-Next-Cursor` header.
+    """
+    ticket_service = TicketService(db)
+    results, next_cursor = await ticket_service.search_tickets(
+        user=current_user, query=q, cursor=cursor, limit=limit
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return results
+
+
+@router.get("/stats", response_model=TicketStats)
+async def get_ticket_stats(
+    user_id: Optional[UUID] = None,
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Dashboard counts: tickets by status, open tickets by age, AI versus human
+    messages and the median time to the first AI reply.
+
+    Read from precomputed counters, so the cost does not grow with the
+    number of tickets. Admins see totals over every user (or one `user_id`'s),
+    other users their own.
+    """
+    ticket_service = TicketService(db)
+    return await ticket_service.get_stats(user=current_user, user_id=user_id)
+
+
+@router.get(
+    "/{ticket_id}", response_model=TicketWithMessages, response_class=ORJSONResponse
+)
 async def get_ticket(
     ticket_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    message_limit: int = Query(settings.TICKET_DETAIL_MESSAGE_LIMIT, ge=1, le=500),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get a specific ticket with its messages.
+    Get a specific ticket with its most recent messages.
+
+    When older messages exist, `X-Next-Cursor` holds the cursor for fetching
+    them from `GET /tickets/{ticket_id}/messages`. Send the `ETag` back as
+    `If-None-Match` to get a 304 instead while nothing has changed.
     """
     ticket_service = TicketService(db)
-    ticket = await ticket_service.get_ticket_with_messages(
-        user=current_user, ticket_id=ticket_id
+    etag = await ticket_service.get_ticket_etag(current_user, ticket_id, message_limit)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    ticket, next_cursor = await ticket_service.get_ticket_with_messages(
+        user=current_user, ticket_id=ticket_id, message_limit=message_limit
     )
-    return ticket
+    with timed("serialize"):
+        response = ORJSONResponse(ticket)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = REVALIDATE
+    return response
 
 
 @router.put("/{ticket_id}", response_model=Ticket)
 async def update_ticket(
     ticket_update: TicketUpdate,
     ticket_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -82,11 +267,47 @@ async def update_ticket(
     return ticket
 
 
+@router.get(
+    "/{ticket_id}/messages", response_model=List[Message], response_class=ORJSONResponse
+)
+async def get_messages(
+    ticket_id: UUID,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    if_none_match: Optional[str] = Header(None),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Page backwards through a ticket's messages, newest page first.
+
+    Each page is in chronological order; pass `X-Next-Cursor` from the
+    previous response as `cursor` to fetch the page before it. Pages carry
+    an `ETag` for conditional requests, as on `GET /tickets/{ticket_id}`.
+    """
+    ticket_service = TicketService(db)
+    etag = await ticket_service.get_ticket_etag(current_user, ticket_id, cursor, limit)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return _not_modified(etag)
+
+    messages, next_cursor = await ticket_service.get_messages(
+        user=current_user, ticket_id=ticket_id, cursor=cursor, limit=limit
+    )
+    with timed("serialize"):
+        response = ORJSONResponse(messages)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if etag is not None:
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = REVALIDATE
+    return response
+
+
 @router.post("/{ticket_id}/messages", response_model=Message)
 async def add_message(
     message_in: MessageCreate,
     ticket_id: UUID,
-    current_user: User = Depends(get_current_active_user),
+    current_user: UserPrincipal = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -102,16 +323,33 @@ async def add_message(
 @router.get("/{ticket_id}/ai-response")
 async def stream_ai_response(
     ticket_id: UUID,
-    current_user: User = Depends(get_current_active_user),
-    db: AsyncSession = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    ai_service: AIService = Depends(get_ai_service),
+    broadcaster: StreamBroadcaster = Depends(get_reply_broadcaster),
+    scheduler: GenerationScheduler = Depends(get_generation_scheduler),
+    offset: int = Query(0, ge=0),
+    last_event_id: Optional[str] = Header(None),
 ):
     """
     Stream an AI response for the latest customer message.
+
+    Event ids are character offsets into the reply. A client that reconnects
+    with `offset` (or the `Last-Event-ID` header) resumes the same reply from
+    there instead of generating a new one.
     """
-    ticket_service = TicketService(db)
-    ticket = await ticket_service.get_ticket_with_messages(
-        user=current_user, ticket_id=ticket_id
-    )
+    if not offset and last_event_id and last_event_id.isdigit():
+        offset = int(last_event_id)
+
+    # Read everything the prompt needs up front and release the connection:
+    # the stream can run for tens of seconds and must not pin a pooled
+    # connection while it does.
+    async with SessionLocal() as session:
+        ticket_service = TicketService(session)
+        ticket, _ = await ticket_service.get_ticket_with_messages(
+            user=current_user,
+            ticket_id=ticket_id,
+            message_limit=settings.AI_HISTORY_MESSAGE_LIMIT,
+        )
     
     if not ticket.messages:
         return StreamingResponse(
@@ -119,45 +357,85 @@ async def stream_ai_response(
             media_type="text/event-stream",
         )
     
-    # Get the latest customer message
-    customer_messages = [msg for msg in ticket.messages if not msg.is_ai]
-    if not customer_messages:
+    # The latest customer message and the history before it
+    prompt = build_reply_prompt(ticket.messages)
+    if prompt is None:
         return StreamingResponse(
             content=iter([b"No customer messages to respond to."]),
             media_type="text/event-stream",
         )
-    
-    latest_message = customer_messages[-1].content
-    
-    # Prepare message history (exclude the latest message)
-    message_history = [
-        {"content": msg.content, "is_ai": msg.is_ai}
-        for msg in ticket.messages
-        if msg.id != customer_messages[-1].id
-    ]
-    
-    # Generate AI response
-    ai_service = AIService()
-    
-    async def generate():
-        full_response = ""
-        async for text_chunk in ai_service.generate_response_stream(
-            ticket_description=ticket.description,
-            message_history=message_history,
-            latest_message=latest_message,
-        ):
-            full_response += text_chunk
-            yield f"data: {text_chunk}\n\n"
-        
-        # After response generation, save it to the database
-        ai_message = MessageCreate(content=full_response, is_ai=True)
-        await ticket_service.add_message(
-            user=current_user, ticket_id=ticket_id, message_in=ai_message
+
+    # Concurrent requests for the same customer message share one generation
+    # (and one saved reply); late joiners first replay what already arrived.
+    # Only the request that starts a generation has to be admitted for it.
+    key = (ticket_id, prompt.message_id)
+    slot = None
+    if not broadcaster.has_stream(key) and not offset:
+        slot = await scheduler.acquire(current_user.id)
+        if broadcaster.has_stream(key):
+            # Another request started it while this one was queued.
+            slot.release()
+            slot = None
+
+    def start_generation():
+        # The reply is checkpointed while it streams, so a failed completion
+        # leaves a truncated message instead of nothing.
+        recorder = StreamRecorder(SessionLocal, ticket_id)
+        return slot.hold(
+            recorder.record(
+                ai_service.generate_response_stream(
+                    ticket_description=ticket.description,
+                    message_history=prompt.message_history,
+                    latest_message=prompt.latest_message,
+                    ticket_id=ticket_id,
+                    owner_id=ticket.user_id,
+                )
+            )
         )
-        
-        yield "data: [DONE]\n\n"
-    
+
+    chunks = broadcaster.subscribe(key, start_generation, offset=offset)
+
     return StreamingResponse(
-        content=generate(),
+        content=encode_stream(chunks, offset=offset),
         media_type="text/event-stream",
-    )
\ No newline at end of file
+        headers=SSE_HEADERS,
+    )
+
+
+@router.post(
+    "/{ticket_id}/ai-response/jobs",
+    response_model=AIJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_ai_response_job(
+    ticket_id: UUID,
+    job_in: Optional[AIJobCreate] = None,
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Queue an AI response for the latest customer message.
+
+    A worker saves the reply as a message; poll the job, or pass a
+    `webhook_url` to be notified when it finishes. Webhook requests are
+    signed (`X-Webhook-Signature`) and only sent to public addresses or
+    allowlisted hosts.
+    """
+    ai_job_service = AIJobService(db)
+    return await ai_job_service.enqueue(
+        user=current_user, ticket_id=ticket_id, job_in=job_in or AIJobCreate()
+    )
+
+
+@router.get("/{ticket_id}/ai-response/jobs/{job_id}", response_model=AIJob)
+async def get_ai_response_job(
+    ticket_id: UUID,
+    job_id: UUID,
+    current_user: UserPrincipal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the status of a queued AI response.
+    """
+    ai_job_service = AIJobService(db)
+    return await ai_job_service.get_job(user=current_user, ticket_id=ticket_id, job_id=job_id)
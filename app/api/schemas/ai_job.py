@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, HttpUrl
+
+
+class AIJobCreate(BaseModel):
+    webhook_url: Optional[HttpUrl] = None
+
+
+class AIJob(BaseModel):
+    id: UUID
+    ticket_id: UUID
+    status: str
+    attempts: int
+    result_message_id: Optional[UUID] = None
+    error: Optional[str] = None
+    created_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+from app.core.config import settings
 
 
 class MessageBase(BaseModel):
@@ -18,6 +20,7 @@ class Message(MessageBase):
     id: UUID
     created_at: datetime
     ticket_id: UUID
+    status: str = "complete"
     
     class Config:
         from_attributes = True
@@ -53,4 +56,60 @@ class Ticket(TicketInDBBase):
 
 
 class TicketWithMessages(Ticket):
-    messages: List[Message] = []
\ No newline at end of file
+    messages: List[Message] = []
+
+
+class TicketSearchResult(BaseModel):
+    ticket: Ticket
+    rank: float
+    snippet: str = Field(
+        ...,
+        description=(
+            "An HTML fragment: the matching text, HTML-escaped, with the "
+            "matched terms wrapped in <mark></mark>. Insert it as markup "
+            "without escaping it again."
+        ),
+    )
+    message_id: Optional[UUID] = None
+
+
+class TicketBulkUpdate(BaseModel):
+    ticket_ids: List[UUID] = Field(..., min_length=1, max_length=settings.BULK_MAX_ITEMS)
+    status: Optional[str] = None
+    user_id: Optional[UUID] = None
+
+    @model_validator(mode="after")
+    def check_has_changes(self) -> "TicketBulkUpdate":
+        if self.status is None and self.user_id is None:
+            raise ValueError("Provide a status and/or a user_id to apply")
+        return self
+
+
+class BulkMessageCreate(MessageCreate):
+    ticket_id: UUID
+
+
+class MessageBulkCreate(BaseModel):
+    messages: List[BulkMessageCreate] = Field(
+        ..., min_length=1, max_length=settings.BULK_MAX_ITEMS
+    )
+
+
+class BulkItemResult(BaseModel):
+    ticket_id: UUID
+    ok: bool
+    message_id: Optional[UUID] = None
+    error: Optional[str] = None
+
+
+class TicketStats(BaseModel):
+    by_status: Dict[str, int]
+    # Open tickets by age in whole days: under_1d, 1d_to_7d, 7d_to_30d, over_30d
+    open_by_age: Dict[str, int]
+    ai_messages: int
+    human_messages: int
+    # Share of all messages written by the AI
+    ai_message_ratio: Optional[float] = None
+    # Tickets that have had an AI reply, and the median time to the first one
+    first_responses: int
+    median_first_response_seconds: Optional[float] = None
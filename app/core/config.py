@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -9,14 +9,115 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 8  # 8 days
+
+    # Authenticated user cache
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+
+    # Password hashing pool ("thread" or "process")
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 4
     
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # asyncpg prepared statement cache per connection (0 disables it, which
+    # is required behind pgbouncer in transaction mode)
+    DB_STATEMENT_CACHE_SIZE: int = 100
     
     # AI
     GROQ_API_KEY: str
     GROQ_MODEL_NAME: str = "llama3-70b-8192"
+    GROQ_BASE_URL: Optional[str] = None
+    GROQ_HTTP2: bool = True
+    GROQ_MAX_CONNECTIONS: int = 100
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GROQ_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    # Streamed replies are checkpointed to the database every N chunks or
+    # every N seconds, whichever comes first.
+    AI_STREAM_CHECKPOINT_CHUNKS: int = 50
+    AI_STREAM_CHECKPOINT_SECONDS: float = 2.0
+    # Replies keep generating if the client disconnects; reconnecting clients
+    # resume from the in-memory replay log for this long after completion.
+    AI_STREAM_RESUME_TTL_SECONDS: float = 300.0
+    AI_STREAM_REPLAY_MAX_CHARS: int = 65536
+    # A reply still marked streaming with no checkpoint for this long was
+    # left behind by a process that died mid-generation. Each API process
+    # marks such replies truncated at startup and then every
+    # AI_STREAM_SWEEP_SECONDS (0 disables; `python -m app.workers.stale_streams`
+    # runs one sweep).
+    AI_STREAM_STALE_SECONDS: float = 300.0
+    AI_STREAM_SWEEP_SECONDS: float = 60.0
+    # Prompt history: the newest messages are kept verbatim, older ones are
+    # condensed, and anything beyond the token budget is dropped.
+    AI_CONTEXT_TOKEN_BUDGET: int = 3000
+    AI_CONTEXT_VERBATIM_MESSAGES: int = 6
+    AI_CONTEXT_CONDENSED_CHARS: int = 200
+    AI_CONTEXT_CACHE_SIZE: int = 1000
+    AI_CONTEXT_CACHE_TTL_SECONDS: int = 3600
+    # Replies to repeated first questions. A similarity threshold (cosine,
+    # 0-1) enables fuzzy matching; leave it unset for exact matches only.
+    AI_RESPONSE_CACHE_ENABLED: bool = True
+    AI_RESPONSE_CACHE_MAX_SIZE: int = 1000
+    AI_RESPONSE_CACHE_TTL_SECONDS: int = 60 * 60 * 24
+    AI_RESPONSE_CACHE_SIMILARITY_THRESHOLD: Optional[float] = None
+    # Generation admission: a global cap on concurrent Groq streams, a
+    # bounded wait queue, and a per-user rate (token bucket with burst).
+    AI_MAX_CONCURRENT_GENERATIONS: int = 16
+    AI_GENERATION_QUEUE_SIZE: int = 100
+    AI_GENERATION_QUEUE_TIMEOUT_SECONDS: float = 30.0
+    AI_USER_GENERATIONS_PER_MINUTE: float = 10.0
+    AI_USER_GENERATION_BURST: int = 5
+    # Retries after a Groq 429, waiting as long as its rate-limit headers say
+    # (capped), while the scheduler holds back other generations. Connection
+    # errors and 5xx responses are retried as often, with exponential backoff.
+    GROQ_RATE_LIMIT_RETRIES: int = 3
+    GROQ_RATE_LIMIT_MAX_BACKOFF_SECONDS: float = 60.0
+    # Queued AI replies (POST /tickets/{id}/ai-response/jobs). API processes
+    # run AI_JOB_INPROCESS_WORKERS workers; set it to 0 when dedicated
+    # workers (`python -m app.workers.ai_jobs`) are deployed instead.
+    AI_JOB_INPROCESS_WORKERS: int = 1
+    AI_JOB_WORKER_CONCURRENCY: int = 4
+    AI_JOB_POLL_SECONDS: float = 1.0
+    AI_JOB_LEASE_SECONDS: int = 300
+    AI_JOB_MAX_ATTEMPTS: int = 3
+    AI_JOB_WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    AI_JOB_WEBHOOK_RETRIES: int = 3
+    # Webhooks are only accepted when a signing secret is set; deliveries
+    # carry an HMAC-SHA256 of the body in X-Webhook-Signature. Targets must
+    # be public addresses, or, when the allowlist is set, one of its hosts
+    # ("example.com", or ".example.com" for any subdomain).
+    AI_JOB_WEBHOOK_SECRET: Optional[str] = None
+    AI_JOB_WEBHOOK_ALLOWED_HOSTS: List[str] = []
+    # Server-sent events: deltas arriving within the flush window (or until
+    # the size threshold) go out as one event; a comment is sent after the
+    # heartbeat interval of silence.
+    SSE_FLUSH_INTERVAL_SECONDS: float = 0.05
+    SSE_FLUSH_CHARS: int = 1024
+    SSE_HEARTBEAT_SECONDS: float = 15.0
     
+    # Messages returned with GET /tickets/{id} and fed to the AI prompt;
+    # older ones are available through GET /tickets/{id}/messages.
+    TICKET_DETAIL_MESSAGE_LIMIT: int = 100
+    AI_HISTORY_MESSAGE_LIMIT: int = 50
+
+    # Most items accepted by one admin bulk request
+    BULK_MAX_ITEMS: int = 10000
+    # Rows fetched per round-trip by the streaming ticket export
+    EXPORT_BATCH_SIZE: int = 1000
+    # Rebuild the dashboard counters from the ticket tables this often in
+    # each API process (0 disables; `python -m app.workers.ticket_stats`
+    # runs one rebuild, e.g. from cron).
+    TICKET_STATS_RECONCILE_SECONDS: float = 0
+
+    # Prometheus histograms at GET /metrics (request, SQL and LLM timings)
+    PROMETHEUS_METRICS_ENABLED: bool = True
+
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
 
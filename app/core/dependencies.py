@@ -1,6 +1,7 @@
 from typing import Generator
+from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 # Import "fastapi" could not be resolved
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
@@ -9,16 +10,24 @@ from sqlalchemy.ext.asyncio import AsyncSession
 # Import "sqlalchemy.ext.asyncio" could not be resolvedPylancereportMissingImports
 
 from app.core.config import settings
-from app.db.base import get_db
+from app.core.instrumentation import timed
+from app.core.user_cache import UserPrincipal, user_cache
+from app.db.base import SessionLocal, get_db
 from app.db.repositories.user_repository import UserRepository
+from app.services.ai_service import AIService
 from app.services.auth_service import AuthService
+from app.services.generation_scheduler import GenerationScheduler
+from app.services.stream_broadcaster import StreamBroadcaster
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
-):
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserPrincipal:
+    with timed("auth"):
+        return await _authenticate(token)
+
+
+async def _authenticate(token: str) -> UserPrincipal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -28,18 +37,29 @@ async def get_current_user(
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
+        subject: str = payload.get("sub")
+        if subject is None:
             raise credentials_exception
-    except JWTError:
+        user_id = UUID(subject)
+    except (JWTError, ValueError):
         raise credentials_exception
-    
-    user_repo = UserRepository(db)
-    user = await user_repo.get_by_id(user_id)
+
+    # The role comes from the (cached) user row, never the token: role
+    # changes and deletions apply within USER_CACHE_TTL_SECONDS.
+    principal = user_cache.get(user_id)
+    if principal is not None:
+        return principal
+
+    # Use a dedicated session so the connection goes back to the pool right
+    # away, even for long-lived (streaming) endpoints.
+    async with SessionLocal() as session:
+        user = await UserRepository(session).get_by_id(user_id)
     if user is None:
         raise credentials_exception
-    
-    return user
+
+    principal = UserPrincipal(id=user.id, role=user.role, email=user.email)
+    user_cache.set(user_id, principal)
+    return principal
 
 
 async def get_current_active_user(current_user = Depends(get_current_user)):
@@ -57,4 +77,16 @@ async def get_admin_user(current_user = Depends(get_current_user)):
 
 def get_auth_service(db: AsyncSession = Depends(get_db)) -> AuthService:
     user_repository = UserRepository(db)
-    return AuthService(user_repository=user_repository)
\ No newline at end of file
+    return AuthService(user_repository=user_repository)
+
+
+def get_ai_service(request: Request) -> AIService:
+    return request.app.state.ai_service
+
+
+def get_reply_broadcaster(request: Request) -> StreamBroadcaster:
+    return request.app.state.reply_broadcaster
+
+
+def get_generation_scheduler(request: Request) -> GenerationScheduler:
+    return request.app.state.generation_scheduler
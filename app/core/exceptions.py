@@ -39,4 +39,79 @@ class NotAuthorizedForTicketException(HTTPException):
         super().__init__(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this ticket",
-        )
\ No newline at end of file
+        )
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+class GenerationRateLimitedException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many AI responses requested, please retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class GenerationQueueFullException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="AI assistant is busy, please retry later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class GenerationQueueTimeoutException(HTTPException):
+    def __init__(self, retry_after: int):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Timed out waiting for the AI assistant",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class StreamNotAvailableException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_410_GONE,
+            detail="AI response stream is no longer available",
+        )
+
+
+class AIJobNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="AI response job not found",
+        )
+
+
+class InvalidWebhookException(HTTPException):
+    def __init__(self, detail: str):
+        super().__init__(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=detail,
+        )
+
+
+class AIJobPendingException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="An AI response is already pending for this ticket with another webhook",
+        )
+
+
+class UserNotFoundException(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
@@ -0,0 +1,294 @@
+"""Per-request timings, Server-Timing headers and Prometheus histograms.
+
+InstrumentationMiddleware opens a RequestTimings for every HTTP request.
+Whatever runs inside the request adds to it: SQL statements through the
+engine hooks, `timed(...)` blocks, and the endpoint itself through
+InstrumentedRoute. The totals go out as a `Server-Timing` header and are
+observed into the histograms served at GET /metrics.
+
+Anything that happens after the response headers are sent (a streamed
+body, an AI reply) cannot be reported in the header; it only reaches the
+histograms.
+"""
+import asyncio
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return format(value, "g")
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for name, value in labels
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class Histogram:
+    """A Prometheus histogram, kept in process memory.
+
+    Every process exposes its own; Prometheus sums them across scrape
+    targets.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        labelnames: Sequence[str] = (),
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        # label values -> [count per bucket (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self._series.items()
+            )
+        for key, counts, total, count in series:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = _format_labels(labels + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {total!r}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[Histogram] = []
+
+    def histogram(self, *args: Any, **kwargs: Any) -> Histogram:
+        histogram = Histogram(*args, **kwargs)
+        self._metrics.append(histogram)
+        return histogram
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to the end of its response body.",
+    labelnames=("method", "route", "status"),
+)
+HTTP_REQUEST_PHASE_SECONDS = registry.histogram(
+    "http_request_phase_duration_seconds",
+    "Time a request spent in each phase (db, auth, serialize).",
+    labelnames=("route", "phase"),
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request.",
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+    labelnames=("route",),
+)
+DB_QUERY_SECONDS = registry.histogram(
+    "db_query_duration_seconds",
+    "Time to execute one SQL statement, as seen by the driver.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = registry.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from requesting a completion to its first content token.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0),
+    labelnames=("model",),
+)
+LLM_TOKENS_PER_SECOND = registry.histogram(
+    "llm_tokens_per_second",
+    "Completion tokens per second after the first token.",
+    buckets=(10, 25, 50, 100, 200, 400, 800, 1600),
+    labelnames=("model",),
+)
+
+
+@dataclass
+class RequestTimings:
+    started: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    spans: Dict[str, float] = field(default_factory=dict)
+    endpoint_finished: Optional[float] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def server_timing(self, total: float) -> str:
+        entries = []
+        for name, seconds in self.spans.items():
+            entry = f"{name};dur={seconds * 1000:.1f}"
+            if name == "db":
+                entry += f';desc="{self.db_queries} queries"'
+            entries.append(entry)
+        entries.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the current request's `name` span."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Time every statement the engine executes."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+        DB_QUERY_SECONDS.observe(elapsed)
+        timings = _current.get()
+        if timings is not None:
+            timings.db_queries += 1
+            timings.add("db", elapsed)
+
+
+def _mark_endpoint_finished() -> None:
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_finished = time.perf_counter()
+
+
+class InstrumentedRoute(APIRoute):
+    """APIRoute that notes when its endpoint returns.
+
+    What follows (validating the result against the response model and
+    rendering it) is reported as the `serialize` span. Endpoints that render
+    their own response (see ORJSONResponse) time it with `timed("serialize")`.
+    """
+
+    def get_route_handler(self) -> Callable:
+        call = self.dependant.call
+        if asyncio.iscoroutinefunction(call):
+
+            @functools.wraps(call)
+            async def endpoint(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return await call(*args, **kwargs)
+                finally:
+                    _mark_endpoint_finished()
+
+        else:
+
+            @functools.wraps(call)
+            def endpoint(*args: Any, **kwargs: Any) -> Any:
+                try:
+                    return call(*args, **kwargs)
+                finally:
+                    _mark_endpoint_finished()
+
+        self.dependant.call = endpoint
+        return super().get_route_handler()
+
+
+class InstrumentationMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_with_timings(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                now = time.perf_counter()
+                if timings.endpoint_finished is not None:
+                    timings.add("serialize", now - timings.endpoint_finished)
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", timings.server_timing(now - timings.started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timings)
+        finally:
+            _current.reset(token)
+            # The route template, not the raw path, keeps label cardinality
+            # bounded; unmatched paths share one series.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - timings.started,
+                method=scope["method"],
+                route=route,
+                status=status_code,
+            )
+            HTTP_REQUEST_DB_QUERIES.observe(timings.db_queries, route=route)
+            for phase, seconds in timings.spans.items():
+                HTTP_REQUEST_PHASE_SECONDS.observe(seconds, route=route, phase=phase)
@@ -0,0 +1,41 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Tuple
+from uuid import UUID
+
+from app.core.exceptions import InvalidCursorException
+
+
+def _encode(values: List[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str) -> List[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    return json.loads(base64.urlsafe_b64decode(padded.encode()))
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    return _encode([created_at.isoformat(), str(id)])
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        created_at, id = _decode(cursor)
+        return datetime.fromisoformat(created_at), UUID(id)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
+
+
+def encode_rank_cursor(rank: float, id: UUID) -> str:
+    return _encode([rank, str(id)])
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, UUID]:
+    try:
+        rank, id = _decode(cursor)
+        return float(rank), UUID(id)
+    except (ValueError, TypeError):
+        raise InvalidCursorException()
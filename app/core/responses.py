@@ -0,0 +1,35 @@
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Row
+
+
+def _default(value: Any) -> Any:
+    # Column rows become objects keyed by their labels. Models built with
+    # `model_construct` hold already-clean values, so their fields go
+    # straight to orjson instead of through model_dump.
+    if isinstance(value, Row):
+        return dict(zip(value._fields, value))
+    if isinstance(value, BaseModel):
+        return value.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON rendered by orjson, which handles UUIDs and datetimes natively.
+
+    Endpoints return it directly, which skips FastAPI's response_model
+    validation and re-encoding, so the content must already have the
+    response model's shape: rows selected with exactly its fields, or
+    schema objects. `response_model` stays on the route for the OpenAPI
+    schema. The body is rendered when the response is built, so build it
+    under `timed("serialize")` for Server-Timing to report it.
+    """
+
+    def render(self, content: Any) -> bytes:
+        # UTC as "Z" to match what Pydantic writes.
+        return orjson.dumps(
+            content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
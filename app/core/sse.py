@@ -0,0 +1,100 @@
+import asyncio
+import re
+from typing import AsyncIterator, Optional
+
+from app.core.config import settings
+
+_NEWLINES = re.compile(r"\r\n|\r|\n")
+_END = object()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop nginx from buffering the stream.
+    "X-Accel-Buffering": "no",
+}
+
+
+def format_event(data: str, id: Optional[str] = None, event: Optional[str] = None) -> str:
+    # Every line of the payload needs its own `data:` field; a bare newline
+    # would end the event early.
+    lines = []
+    if event is not None:
+        lines.append(f"event: {event}")
+    if id is not None:
+        lines.append(f"id: {id}")
+    lines.extend(f"data: {line}" for line in _NEWLINES.split(data))
+    return "\n".join(lines) + "\n\n"
+
+
+def format_comment(text: str = "") -> str:
+    return f": {text}\n\n"
+
+
+async def encode_stream(
+    chunks: AsyncIterator[str],
+    offset: int = 0,
+    flush_interval: float = settings.SSE_FLUSH_INTERVAL_SECONDS,
+    flush_chars: int = settings.SSE_FLUSH_CHARS,
+    heartbeat_interval: float = settings.SSE_HEARTBEAT_SECONDS,
+    done: Optional[str] = "[DONE]",
+) -> AsyncIterator[str]:
+    """Frame a text stream as server-sent events.
+
+    Chunks arriving within `flush_interval` seconds of each other are sent as
+    one event (sooner once `flush_chars` have built up). Each event's id is
+    the character offset of the text after it, counted from `offset`, so a
+    client can tell how much of the reply it has. A comment is sent whenever
+    the source has been quiet for `heartbeat_interval` seconds, so that idle
+    proxies keep the connection open. `done` is sent as the final event.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def pump() -> None:
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as exc:
+            await queue.put(exc)
+        else:
+            await queue.put(_END)
+
+    pump_task = asyncio.create_task(pump())
+    heartbeat = heartbeat_interval if heartbeat_interval > 0 else None
+    try:
+        finished = False
+        while not finished:
+            try:
+                item = await asyncio.wait_for(queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield format_comment("ping")
+                continue
+
+            pending, size = [], 0
+            deadline = loop.time() + flush_interval
+            while True:
+                if item is _END or isinstance(item, Exception):
+                    finished = True
+                    break
+                pending.append(item)
+                size += len(item)
+                remaining = deadline - loop.time()
+                if size >= flush_chars or remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            if pending:
+                text = "".join(pending)
+                offset += len(text)
+                yield format_event(text, id=str(offset))
+            if isinstance(item, Exception):
+                raise item
+
+        if done is not None:
+            yield format_event(done)
+    finally:
+        pump_task.cancel()
+        await asyncio.gather(pump_task, return_exceptions=True)
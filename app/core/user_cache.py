@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import Optional, Union
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class UserPrincipal:
+    """The authenticated caller, detached from any database session."""
+
+    id: UUID
+    role: str
+    email: Optional[str] = None
+
+
+user_cache: TTLCache[UUID, UserPrincipal] = TTLCache(
+    maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user(user_id: Union[UUID, str]) -> None:
+    user_cache.invalidate(UUID(str(user_id)))
@@ -0,0 +1,120 @@
+"""Outbound webhook safety: target checks and payload signatures.
+
+Webhook URLs come from API callers, so without checks any user could make
+the server send requests to internal services. A URL is accepted when its
+host is listed in AI_JOB_WEBHOOK_ALLOWED_HOSTS, or, with no allowlist
+configured, when every address it resolves to is public. The check runs
+again when the webhook is delivered (PublicOnlyResolver), so a DNS record
+changed in between cannot point the request inward.
+"""
+import asyncio
+import hashlib
+import hmac
+import ipaddress
+import socket
+import time
+from typing import List, Optional
+from urllib.parse import urlsplit
+
+from aiohttp.abc import AbstractResolver, ResolveResult
+from aiohttp.resolver import DefaultResolver
+
+from app.core.config import settings
+
+SIGNATURE_HEADER = "X-Webhook-Signature"
+
+
+class WebhookTargetError(ValueError):
+    pass
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _host_allowed(host: str) -> bool:
+    # "example.com" matches only that host; ".example.com" any subdomain.
+    for allowed in settings.AI_JOB_WEBHOOK_ALLOWED_HOSTS:
+        allowed = allowed.lower()
+        if host == allowed or (allowed.startswith(".") and host.endswith(allowed)):
+            return True
+    return False
+
+
+def _split(url: str):
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookTargetError("Webhook URL must be an http(s) URL")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return parts.hostname.lower(), port
+
+
+async def check_webhook_url(url: str) -> None:
+    """Raise WebhookTargetError unless webhooks may be sent to `url`."""
+    if not settings.AI_JOB_WEBHOOK_SECRET:
+        raise WebhookTargetError("Webhooks are not enabled on this server")
+    host, port = _split(url)
+    if settings.AI_JOB_WEBHOOK_ALLOWED_HOSTS:
+        if not _host_allowed(host):
+            raise WebhookTargetError("Webhook host is not allowed")
+        return
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+    except socket.gaierror:
+        raise WebhookTargetError("Webhook host does not resolve")
+    if not infos or not all(is_public_address(info[4][0]) for info in infos):
+        raise WebhookTargetError("Webhook host must be a public address")
+
+
+class PublicOnlyResolver(AbstractResolver):
+    """Resolves like aiohttp's default resolver, but refuses any host that
+    has a non-public address, unless the host is on the allowlist."""
+
+    def __init__(self):
+        self._resolver = DefaultResolver()
+
+    async def resolve(
+        self, host: str, port: int = 0, family: socket.AddressFamily = socket.AF_INET
+    ) -> List[ResolveResult]:
+        results = await self._resolver.resolve(host, port, family)
+        if _host_allowed(host.lower()):
+            return results
+        if not all(is_public_address(result["host"]) for result in results):
+            raise OSError(f"Refusing to send a webhook to {host}: not a public address")
+        return results
+
+    async def close(self) -> None:
+        await self._resolver.close()
+
+
+def check_delivery_target(url: str) -> None:
+    # aiohttp skips the resolver for IP literals, so check those here.
+    host, _ = _split(url)
+    if _host_allowed(host):
+        return
+    try:
+        literal = is_public_address(host.strip("[]"))
+    except ValueError:
+        return
+    if not literal:
+        raise WebhookTargetError("Webhook host must be a public address")
+
+
+def sign(body: bytes, timestamp: Optional[int] = None) -> str:
+    """`X-Webhook-Signature` value: `t=<unix time>,v1=<hex HMAC-SHA256>`.
+
+    The HMAC, keyed with AI_JOB_WEBHOOK_SECRET, covers "<t>.<body>";
+    receivers recompute it and should reject stale timestamps.
+    """
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(
+        settings.AI_JOB_WEBHOOK_SECRET.encode(),
+        str(timestamp).encode() + b"." + body,
+        hashlib.sha256,
+    ).hexdigest()
+    return f"t={timestamp},v1={digest}"
@@ -1,14 +1,33 @@
 import uuid
 from datetime import datetime, timezone
 from typing import AsyncGenerator
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, DateTime, make_url
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.db.pool import InstrumentedAsyncQueuePool
 
-engine = create_async_engine(settings.DATABASE_URL)
+
+def _connect_args() -> dict:
+    if make_url(settings.DATABASE_URL).get_driver_name() == "asyncpg":
+        return {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+    return {}
+
+
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args=_connect_args(),
+)
+instrument_engine(engine.sync_engine)
 SessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
@@ -1,7 +1,24 @@
-from sqlalchemy import Boolean, Column, ForeignKey, String, Text
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-from app.db.base import BaseModel
+from sqlalchemy import (
+    DDL,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
+from app.db.base import Base, BaseModel
+
+# Text search configuration of the search vectors; queries must use the
+# same one for the GIN indexes to apply.
+SEARCH_CONFIG = "english"
 
 
 class User(BaseModel):
@@ -17,11 +34,158 @@ class Ticket(BaseModel):
     status = Column(String, default="open")
     user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
     user = relationship("User", back_populates="tickets")
-    messages = relationship("Message", back_populates="ticket", cascade="all, delete")
+    # When the first AI reply was added; feeds the first-response stats.
+    first_response_at = Column(DateTime)
+    # Maintained by a trigger (see _search_vector_trigger); deferred so
+    # ordinary loads never fetch it.
+    search_vector = deferred(Column(TSVECTOR))
+    messages = relationship(
+        "Message",
+        back_populates="ticket",
+        cascade="all, delete",
+        order_by="(Message.created_at, Message.id)",
+    )
+
+    __table_args__ = (
+        Index("ix_ticket_created_at_id", "created_at", "id"),
+        Index("ix_ticket_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_ticket_user_id_status_created_at_id",
+            "user_id",
+            "status",
+            "created_at",
+            "id",
+        ),
+        Index("ix_ticket_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+
+class MessageStatus:
+    STREAMING = "streaming"
+    COMPLETE = "complete"
+    TRUNCATED = "truncated"
 
 
 class Message(BaseModel):
     content = Column(Text)
     is_ai = Column(Boolean, default=False)
+    status = Column(
+        String, default=MessageStatus.COMPLETE, server_default=MessageStatus.COMPLETE
+    )
     ticket_id = Column(UUID(as_uuid=True), ForeignKey("ticket.id"))
-    ticket = relationship("Ticket", back_populates="messages")
\ No newline at end of file
+    ticket = relationship("Ticket", back_populates="messages")
+    # Maintained by a trigger, like Ticket.search_vector.
+    search_vector = deferred(Column(TSVECTOR))
+
+    __table_args__ = (
+        Index("ix_message_ticket_id_created_at_id", "ticket_id", "created_at", "id"),
+        Index("ix_message_search_vector", "search_vector", postgresql_using="gin"),
+        # Only replies still being written; keeps the stale-stream sweep cheap.
+        Index(
+            "ix_message_streaming_updated_at",
+            "updated_at",
+            postgresql_where=text(f"status = '{MessageStatus.STREAMING}'"),
+        ),
+    )
+
+
+def _search_vector_trigger(table, columns: str, expression: str) -> None:
+    # A trigger rather than a STORED generated column: Postgres can only add
+    # one of those by rewriting the whole table under an exclusive lock. The
+    # migration that added the columns installs the same triggers.
+    name = f"{table.name}_search_vector_update"
+    function = DDL(
+        f"CREATE FUNCTION {name}() RETURNS trigger AS $$ "
+        f"BEGIN NEW.search_vector := {expression}; RETURN NEW; END "
+        "$$ LANGUAGE plpgsql"
+    )
+    trigger = DDL(
+        f"CREATE TRIGGER {name} BEFORE INSERT OR UPDATE OF {columns} "
+        f"ON {table.name} FOR EACH ROW EXECUTE FUNCTION {name}()"
+    )
+    event.listen(table, "after_create", function.execute_if(dialect="postgresql"))
+    event.listen(table, "after_create", trigger.execute_if(dialect="postgresql"))
+
+
+_search_vector_trigger(
+    Ticket.__table__,
+    "title, description",
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B')",
+)
+_search_vector_trigger(
+    Message.__table__,
+    "content",
+    f"to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.content, ''))",
+)
+
+
+class AIJobStatus:
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class AIJob(BaseModel):
+    __tablename__ = "ai_job"
+
+    ticket_id = Column(
+        UUID(as_uuid=True), ForeignKey("ticket.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = Column(UUID(as_uuid=True), ForeignKey("user.id"))
+    status = Column(
+        String, default=AIJobStatus.QUEUED, server_default=AIJobStatus.QUEUED, nullable=False
+    )
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)
+    webhook_url = Column(String)
+    result_message_id = Column(
+        UUID(as_uuid=True), ForeignKey("message.id", ondelete="SET NULL")
+    )
+    error = Column(Text)
+    # A running job whose lease has lapsed (its worker died) is claimable again.
+    locked_until = Column(DateTime)
+    completed_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_ai_job_status_created_at", "status", "created_at"),
+        Index("ix_ai_job_ticket_id_status", "ticket_id", "status"),
+    )
+
+
+# Dashboard counters, kept current by TicketRepository's write paths and
+# rebuilt from the tickets and messages by TicketStatsRepository.reconcile.
+
+
+class TicketStatusCount(Base):
+    __tablename__ = "ticket_status_count"
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    status = Column(String, primary_key=True)
+    # Tickets are counted per creation day so open tickets can be bucketed
+    # by age without touching the ticket table.
+    created_on = Column(Date, primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class TicketReplyCount(Base):
+    __tablename__ = "ticket_reply_count"
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    ai_messages = Column(Integer, nullable=False, default=0, server_default="0")
+    human_messages = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class FirstResponseCount(Base):
+    __tablename__ = "first_response_count"
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Index into FIRST_RESPONSE_BUCKETS (ticket_stats_repository).
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
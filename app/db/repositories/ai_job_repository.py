@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import case, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.ai_job import AIJobCreate
+from app.db.models import AIJob, AIJobStatus, Ticket
+from app.db.repositories.base import BaseRepository
+
+
+class AIJobRepository(BaseRepository[AIJob, AIJobCreate, AIJobCreate]):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session, AIJob)
+
+    async def get_by_id_owned(
+        self, job_id: UUID, ticket_id: UUID, owner_id: Optional[UUID] = None
+    ) -> Optional[AIJob]:
+        stmt = select(AIJob).where(AIJob.id == job_id, AIJob.ticket_id == ticket_id)
+        if owner_id is not None:
+            stmt = stmt.join(Ticket, Ticket.id == AIJob.ticket_id).where(
+                Ticket.user_id == owner_id
+            )
+        return await self.db.scalar(stmt)
+
+    async def get_pending_for_ticket(self, ticket_id: UUID) -> Optional[AIJob]:
+        stmt = select(AIJob).where(
+            AIJob.ticket_id == ticket_id,
+            AIJob.status.in_([AIJobStatus.QUEUED, AIJobStatus.RUNNING]),
+        )
+        return await self.db.scalar(stmt.limit(1))
+
+    async def claim_next(self, lease_seconds: float) -> Optional[AIJob]:
+        """Atomically take the oldest claimable job and lease it.
+
+        FOR UPDATE SKIP LOCKED lets any number of workers poll the same table
+        without blocking on, or double-claiming, each other's rows.
+        """
+        now = datetime.now(timezone.utc)
+        claimable = (
+            select(AIJob.id)
+            .where(
+                or_(
+                    AIJob.status == AIJobStatus.QUEUED,
+                    (AIJob.status == AIJobStatus.RUNNING) & (AIJob.locked_until < now),
+                )
+            )
+            .order_by(AIJob.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(AIJob)
+            .where(AIJob.id == claimable)
+            .values(
+                status=AIJobStatus.RUNNING,
+                attempts=AIJob.attempts + 1,
+                locked_until=now + timedelta(seconds=lease_seconds),
+            )
+            .returning(AIJob)
+            .execution_options(populate_existing=True)
+        )
+        return await self.db.scalar(stmt)
+
+    async def mark_succeeded(
+        self, job_id: UUID, result_message_id: UUID
+    ) -> Optional[AIJob]:
+        stmt = (
+            update(AIJob)
+            .where(AIJob.id == job_id)
+            .values(
+                status=AIJobStatus.SUCCEEDED,
+                result_message_id=result_message_id,
+                error=None,
+                locked_until=None,
+                completed_at=datetime.now(timezone.utc),
+            )
+            .returning(AIJob)
+            .execution_options(populate_existing=True)
+        )
+        return await self.db.scalar(stmt)
+
+    async def mark_failed(
+        self,
+        job_id: UUID,
+        error: str,
+        max_attempts: int,
+        partial_message_id: Optional[UUID] = None,
+    ) -> Optional[AIJob]:
+        # Requeue until the job has used up its attempts. The truncated reply
+        # an attempt left behind is kept as the result, so the next attempt
+        # writes over it instead of adding a second message.
+        exhausted = AIJob.attempts >= max_attempts
+        stmt = (
+            update(AIJob)
+            .where(AIJob.id == job_id)
+            .values(
+                status=case((exhausted, AIJobStatus.FAILED), else_=AIJobStatus.QUEUED),
+                error=error,
+                result_message_id=partial_message_id,
+                locked_until=None,
+                completed_at=case((exhausted, datetime.now(timezone.utc)), else_=None),
+            )
+            .returning(AIJob)
+            .execution_options(populate_existing=True)
+        )
+        return await self.db.scalar(stmt)
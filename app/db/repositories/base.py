@@ -1,12 +1,13 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar, Union
 from uuid import UUID
 
-from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel as PydanticBaseModel
-from sqlalchemy import select
+from sqlalchemy import Select, inspect, insert, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
+from app.core.pagination import decode_cursor, encode_cursor
+
 class Base(DeclarativeBase):
     pass
 
@@ -15,50 +16,103 @@ CreateSchemaType = TypeVar("CreateSchemaType", bound=PydanticBaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=PydanticBaseModel)
 
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """Data access for one model.
+
+    Repositories never commit. Writes are single INSERT/UPDATE ... RETURNING
+    statements that leave the transaction open, and whoever owns the session
+    (get_db, or an explicit `session.begin()` block) commits once for the
+    whole unit of work.
+    """
+
     def __init__(self, db_session: AsyncSession, model: Type[ModelType]):
         self.db = db_session
         self.model = model
+        self._columns = frozenset(inspect(model).columns.keys())
+
+    def _column_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in data.items() if key in self._columns}
 
     async def get_by_id(self, id: Union[UUID, str]) -> Optional[ModelType]:
         stmt = select(self.model).where(self.model.id == id)
         result = await self.db.execute(stmt)
         return result.scalars().first()
 
-    async def get_multi(self, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
-        stmt = select(self.model).offset(skip).limit(limit)
+    async def get_multi(
+        self, *, cursor: Optional[str] = None, limit: int = 100
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        return await self._paginate(select(self.model), cursor=cursor, limit=limit)
+
+    async def _paginate(
+        self,
+        stmt: Select,
+        *,
+        cursor: Optional[str],
+        limit: int,
+        model: Optional[Type[Base]] = None,
+        rows: bool = False,
+    ) -> Tuple[List[Any], Optional[str]]:
+        # Keyset pagination on (created_at, id), newest first. Each page is a
+        # bounded index range scan instead of an OFFSET over every prior row.
+        # With `rows`, `stmt` selects plain columns (including created_at and
+        # id) and the page holds Row tuples instead of entities.
+        model = model or self.model
+        if cursor is not None:
+            created_at, id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(model.created_at, model.id) < tuple_(created_at, id)
+            )
+        stmt = stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
         result = await self.db.execute(stmt)
-        return result.scalars().all()
+        items = result.all() if rows else result.scalars().all()
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        return items, next_cursor
+
+    async def create(
+        self, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            obj_in_data = obj_in
+        else:
+            obj_in_data = obj_in.model_dump()
 
-    async def create(self, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
-        return db_obj
+        stmt = (
+            insert(self.model)
+            .values(**self._column_values(obj_in_data))
+            .returning(self.model)
+        )
+        return await self.db.scalar(stmt)
 
     async def update(
         self, *, db_obj: ModelType, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
-            update_data = obj_in.dict(exclude_unset=True)
+            update_data = obj_in.model_dump(exclude_unset=True)
 
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
+        values = self._column_values(update_data)
+        if not values:
+            return db_obj
 
-        self.db.add(db_obj)
-        await self.db.commit()
-        await self.db.refresh(db_obj)
-        return db_obj
+        stmt = (
+            update(self.model)
+            .where(self.model.id == db_obj.id)
+            .values(**values)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
+        )
+        return await self.db.scalar(stmt)
 
     async def delete(self, *, id: Union[UUID, str]) -> Optional[ModelType]:
+        # Goes through the ORM so relationship cascades (e.g. a ticket's
+        # messages) are applied.
         obj = await self.get_by_id(id)
         if obj is None:
             return None
         await self.db.delete(obj)
-        await self.db.commit()
+        await self.db.flush()
         return obj
@@ -1,40 +1,625 @@
-from typing import List, Optional
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import (
+    Insert,
+    Row,
+    Select,
+    and_,
+    any_,
+    bindparam,
+    case,
+    cast,
+    exists,
+    func,
+    insert,
+    literal,
+    null,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    REAL,
+    UUID as PG_UUID,
+    ts_headline,
+    websearch_to_tsquery,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
-from app.db.models import Message, Ticket, User
+from app.core.pagination import decode_rank_cursor, encode_rank_cursor
+from app.db.models import SEARCH_CONFIG, Message, MessageStatus, Ticket
 from app.db.repositories.base import BaseRepository
+from app.db.repositories.ticket_stats_repository import (
+    TicketStatsRepository,
+    first_response_bucket,
+)
 from app.api.schemas.ticket import MessageCreate, TicketCreate, TicketUpdate
 
+# The columns the read endpoints return, selected as plain rows so large
+# pages skip building and tracking ORM entities.
+TICKET_COLUMNS = (
+    Ticket.id,
+    Ticket.title,
+    Ticket.description,
+    Ticket.status,
+    Ticket.user_id,
+    Ticket.created_at,
+)
+MESSAGE_COLUMNS = (
+    Message.id,
+    Message.content,
+    Message.is_ai,
+    Message.status,
+    Message.ticket_id,
+    Message.created_at,
+)
+
+
+def _escape_html(text):
+    # html.escape, in SQL: "&" first so the other entities stay intact.
+    for char, entity in (
+        ("&", "&amp;"),
+        ("<", "&lt;"),
+        (">", "&gt;"),
+        ('"', "&quot;"),
+        ("'", "&#x27;"),
+    ):
+        text = func.replace(text, char, entity)
+    return text
+
 
 class TicketRepository(BaseRepository[Ticket, TicketCreate, TicketUpdate]):
+    # Every write below also applies its delta to the dashboard counters
+    # (TicketStatsRepository), in the same transaction.
+
     def __init__(self, db_session: AsyncSession):
         super().__init__(db_session, Ticket)
+        self.stats = TicketStatsRepository(db_session)
+
+    async def create(
+        self, *, obj_in: Union[TicketCreate, Dict[str, Any]]
+    ) -> Ticket:
+        ticket = await super().create(obj_in=obj_in)
+        await self.stats.add_tickets(
+            Counter({(ticket.user_id, ticket.status, ticket.created_at.date()): 1})
+        )
+        return ticket
+
+    async def delete(self, *, id: Union[UUID, str]) -> Optional[Ticket]:
+        # Counted before the delete cascades to the messages.
+        ticket = await self.get_by_id(id)
+        if ticket is None:
+            return None
+        await self.stats.remove_tickets([ticket])
+        return await super().delete(id=id)
+
+    # The `*_owned` methods fold the ownership check into the statement
+    # itself. `owner_id=None` means unrestricted (admins). They return None
+    # when no row matched; use `exists` to tell "missing" from "forbidden".
+
+    @staticmethod
+    def _owned(ticket_id: UUID, owner_id: Optional[UUID]) -> list:
+        criteria = [Ticket.id == ticket_id]
+        if owner_id is not None:
+            criteria.append(Ticket.user_id == owner_id)
+        return criteria
+
+    async def exists(self, ticket_id: UUID) -> bool:
+        return await self.db.scalar(select(exists().where(Ticket.id == ticket_id)))
+
+    async def get_by_id_owned(
+        self, ticket_id: UUID, owner_id: Optional[UUID] = None
+    ) -> Optional[Ticket]:
+        stmt = select(Ticket).where(*self._owned(ticket_id, owner_id))
+        return await self.db.scalar(stmt)
+
+    async def get_by_id_with_recent_messages(
+        self, ticket_id: UUID, owner_id: Optional[UUID], message_limit: int
+    ) -> Tuple[Optional[Row], List[Row], Optional[str]]:
+        """A ticket row with only its newest `message_limit` message rows.
+
+        The messages are in chronological order; the returned cursor pages
+        further back through `get_messages`.
+        """
+        stmt = select(*TICKET_COLUMNS).where(*self._owned(ticket_id, owner_id))
+        ticket = (await self.db.execute(stmt)).first()
+        if ticket is None:
+            return None, [], None
+        messages, next_cursor = await self.get_messages(ticket_id, limit=message_limit)
+        return ticket, messages, next_cursor
+
+    async def get_version(
+        self, ticket_id: UUID, owner_id: Optional[UUID] = None
+    ) -> Optional[Row]:
+        """`(updated_at, newest_message_id)` of a ticket, or None if not visible.
+
+        What the ETags of the ticket's representations are built from. One
+        primary key lookup plus a single step down the (ticket_id,
+        created_at, id) index; no messages are loaded.
+        """
+        newest_message_id = (
+            select(Message.id)
+            .where(Message.ticket_id == Ticket.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        stmt = select(
+            Ticket.updated_at, newest_message_id.label("newest_message_id")
+        ).where(*self._owned(ticket_id, owner_id))
+        return (await self.db.execute(stmt)).first()
+
+    async def get_messages(
+        self,
+        ticket_id: UUID,
+        owner_id: Optional[UUID] = None,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Row], Optional[str]]:
+        """A page of message rows, walking backwards from the newest.
+
+        Each page is returned in chronological order. Served by the
+        (ticket_id, created_at, id) index, so the cost depends on the page
+        size and not on the length of the conversation.
+        """
+        stmt = select(*MESSAGE_COLUMNS).where(Message.ticket_id == ticket_id)
+        if owner_id is not None:
+            stmt = stmt.join(Ticket, Ticket.id == Message.ticket_id).where(
+                Ticket.user_id == owner_id
+            )
+        messages, next_cursor = await self._paginate(
+            stmt, cursor=cursor, limit=limit, model=Message, rows=True
+        )
+        return list(reversed(messages)), next_cursor
+
+    async def update_owned(
+        self, ticket_id: UUID, owner_id: Optional[UUID], obj_in: Dict[str, Any]
+    ) -> Optional[Ticket]:
+        values = self._column_values(obj_in)
+        if not values:
+            stmt = select(Ticket).where(*self._owned(ticket_id, owner_id))
+            return await self.db.scalar(stmt)
+        if "status" in values or "user_id" in values:
+            stmt = self._update_counted(self._owned(ticket_id, owner_id), values, Ticket)
+            rows = (await self.db.execute(stmt)).all()
+            await self.stats.update_tickets(rows)
+            return rows[0][0] if rows else None
 
-    async def get_by_id_with_messages(self, ticket_id: UUID) -> Optional[Ticket]:
         stmt = (
-            select(Ticket)
-            .where(Ticket.id == ticket_id)
-            .options(selectinload(Ticket.messages))
+            update(Ticket)
+            .where(*self._owned(ticket_id, owner_id))
+            .values(**values)
+            .returning(Ticket)
+            .execution_options(populate_existing=True)
+        )
+        return await self.db.scalar(stmt)
+
+    async def add_message_owned(
+        self,
+        ticket_id: UUID,
+        owner_id: Optional[UUID],
+        message_in: MessageCreate,
+        status: str = MessageStatus.COMPLETE,
+    ) -> Optional[Message]:
+        # INSERT ... SELECT FROM ticket: inserts nothing unless the ticket
+        # exists and is visible to the caller.
+        now = datetime.now(timezone.utc)
+        source = select(
+            literal(uuid.uuid4(), Message.id.type),
+            literal(message_in.content, Message.content.type),
+            literal(message_in.is_ai, Message.is_ai.type),
+            literal(status, Message.status.type),
+            Ticket.id,
+            literal(now, Message.created_at.type),
+            literal(now, Message.updated_at.type),
+        ).where(*self._owned(ticket_id, owner_id))
+        stmt = insert(Message.__table__).from_select(
+            [
+                "id",
+                "content",
+                "is_ai",
+                "status",
+                "ticket_id",
+                "created_at",
+                "updated_at",
+            ],
+            source,
+        )
+        return await self._insert_message(stmt)
+
+    async def _insert_message(self, stmt: Insert) -> Optional[Message]:
+        # One statement per message: data-modifying CTEs carry the new row
+        # into its ticket (updated_at, and first_response_at for the first
+        # AI reply) and into the counters. Like `_update_counted`, the
+        # `previous` CTE locks the ticket and reads first_response_at before
+        # the UPDATE sets it, so a first reply is counted exactly once.
+        inserted = stmt.returning(*Message.__table__.c).cte("inserted")
+        previous = (
+            select(
+                Ticket.id,
+                Ticket.first_response_at,
+                inserted.c.is_ai,
+                inserted.c.created_at.label("message_created_at"),
+            )
+            .join(inserted, inserted.c.ticket_id == Ticket.id)
+            .with_for_update(of=Ticket)
+            .cte("previous")
         )
-        result = await self.db.execute(stmt)
-        return result.scalars().first()
+        first_response = and_(
+            previous.c.is_ai.is_(True), previous.c.first_response_at.is_(None)
+        )
+        touched = (
+            update(Ticket)
+            .where(Ticket.id == previous.c.id)
+            .values(
+                updated_at=previous.c.message_created_at,
+                first_response_at=case(
+                    (first_response, previous.c.message_created_at),
+                    else_=previous.c.first_response_at,
+                ),
+            )
+            .returning(
+                Ticket.user_id,
+                Ticket.created_at,
+                previous.c.is_ai,
+                previous.c.message_created_at.label("at"),
+                first_response.label("first_response"),
+            )
+            .cte("touched")
+        )
+        stmt = select(aliased(Message, inserted)).add_cte(
+            *self.stats.count_new_messages(touched)
+        )
+        return await self.db.scalar(stmt)
 
-    async def get_user_tickets(self, user_id: UUID) -> List[Ticket]:
-        stmt = select(Ticket).where(Ticket.user_id == user_id)
-        result = await self.db.execute(stmt)
-        return result.scalars().all()
+    async def _touch(self, criteria, at: datetime) -> None:
+        # A ticket's updated_at moves with its messages too, so it (with the
+        # newest message id) versions the whole conversation for ETags.
+        stmt = (
+            update(Ticket)
+            .where(criteria)
+            .values(updated_at=at)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.execute(stmt)
+
+    async def _record_first_responses(self, criteria, at: datetime) -> None:
+        # Only the first AI reply on a ticket sets `first_response_at`, and
+        # only those tickets come back to be counted.
+        stmt = (
+            update(Ticket)
+            .where(criteria, Ticket.first_response_at.is_(None))
+            .values(first_response_at=at)
+            .returning(Ticket.user_id, Ticket.created_at)
+            .execution_options(synchronize_session=False)
+        )
+        first_responses = Counter(
+            (user_id, first_response_bucket(created_at, at))
+            for user_id, created_at in await self.db.execute(stmt)
+        )
+        await self.stats.add_first_responses(first_responses)
+
+    @staticmethod
+    def _update_counted(criteria: list, values: Dict[str, Any], *returning):
+        # The CTE locks the matched rows and reads their owner and status
+        # before the UPDATE changes them, so the counters can be moved
+        # without a separate SELECT.
+        previous = (
+            select(Ticket.id, Ticket.user_id, Ticket.status)
+            .where(*criteria)
+            .with_for_update()
+            .cte("previous")
+        )
+        return (
+            update(Ticket)
+            .where(Ticket.id == previous.c.id)
+            .values(**values)
+            .returning(
+                *returning,
+                previous.c.user_id.label("previous_user_id"),
+                previous.c.status.label("previous_status"),
+            )
+            .execution_options(populate_existing=True)
+        )
+
+    async def get_user_tickets(
+        self,
+        user_id: UUID,
+        *,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Row], Optional[str]]:
+        stmt = self._filtered(
+            select(*TICKET_COLUMNS).where(Ticket.user_id == user_id),
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+        )
+        return await self._paginate(stmt, cursor=cursor, limit=limit, rows=True)
 
-    async def add_message(self, ticket_id: UUID, message_in: MessageCreate) -> Message:
-        message = Message(
+    async def stream_with_messages(
+        self,
+        owner_id: Optional[UUID] = None,
+        *,
+        user_id: Optional[UUID] = None,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Tickets outer-joined with their messages, oldest first, in batches.
+
+        Rows come from a server-side cursor `batch_size` at a time, so memory
+        use does not grow with the number of rows. Plain columns are selected
+        rather than entities to keep ORM identity tracking out of the way.
+        """
+        stmt = (
+            select(
+                Ticket.id,
+                Ticket.title,
+                Ticket.description,
+                Ticket.status,
+                Ticket.user_id,
+                Ticket.created_at,
+                Message.id.label("message_id"),
+                Message.content.label("message_content"),
+                Message.is_ai.label("message_is_ai"),
+                Message.status.label("message_status"),
+                Message.created_at.label("message_created_at"),
+            )
+            .outerjoin(Message, Message.ticket_id == Ticket.id)
+            .order_by(Ticket.created_at, Ticket.id, Message.created_at, Message.id)
+        )
+        if owner_id is not None:
+            stmt = stmt.where(Ticket.user_id == owner_id)
+        if user_id is not None:
+            stmt = stmt.where(Ticket.user_id == user_id)
+        stmt = self._filtered(
+            stmt, status=status, created_after=created_after, created_before=created_before
+        )
+        result = await self.db.stream(stmt.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+    @staticmethod
+    def _filtered(
+        stmt: Select,
+        *,
+        status: Optional[str],
+        created_after: Optional[datetime],
+        created_before: Optional[datetime],
+    ) -> Select:
+        if status is not None:
+            stmt = stmt.where(Ticket.status == status)
+        if created_after is not None:
+            stmt = stmt.where(Ticket.created_at >= created_after)
+        if created_before is not None:
+            stmt = stmt.where(Ticket.created_at < created_before)
+        return stmt
+
+    async def search(
+        self,
+        query: str,
+        owner_id: Optional[UUID] = None,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Tuple[Ticket, float, Optional[UUID], str]], Optional[str]]:
+        """Tickets whose title, description or messages match `query`.
+
+        Returns (ticket, rank, best matching message id, snippet) rows, best
+        match first, keyset-paginated on (rank, id). Both sides of the match
+        are served by the GIN indexes on the search vectors, and snippets are
+        only highlighted for the rows on the page.
+        """
+        stmt = self._search_statement(query, owner_id, cursor=cursor, limit=limit)
+        rows = [tuple(row) for row in (await self.db.execute(stmt)).all()]
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_rank_cursor(rows[-1][1], rows[-1][0].id)
+        return rows, next_cursor
+
+    @staticmethod
+    def _search_statement(
+        query: str, owner_id: Optional[UUID], *, cursor: Optional[str], limit: int
+    ) -> Select:
+        tsquery = websearch_to_tsquery(SEARCH_CONFIG, query)
+
+        ticket_hits = select(
+            Ticket.id.label("ticket_id"),
+            func.ts_rank(Ticket.search_vector, tsquery).label("rank"),
+            cast(null(), PG_UUID(as_uuid=True)).label("message_id"),
+        ).where(Ticket.search_vector.bool_op("@@")(tsquery))
+        message_hits = (
+            select(
+                Message.ticket_id,
+                func.ts_rank(Message.search_vector, tsquery),
+                Message.id,
+            )
+            .join(Ticket, Ticket.id == Message.ticket_id)
+            .where(Message.search_vector.bool_op("@@")(tsquery))
+        )
+        if owner_id is not None:
+            ticket_hits = ticket_hits.where(Ticket.user_id == owner_id)
+            message_hits = message_hits.where(Ticket.user_id == owner_id)
+        hits = union_all(ticket_hits, message_hits).subquery("hits")
+
+        # One row per ticket: its best-ranked hit.
+        best = (
+            select(hits.c.ticket_id, hits.c.rank, hits.c.message_id)
+            .distinct(hits.c.ticket_id)
+            .order_by(hits.c.ticket_id, hits.c.rank.desc())
+            .subquery("best")
+        )
+        page = select(best)
+        if cursor is not None:
+            rank, id = decode_rank_cursor(cursor)
+            page = page.where(
+                tuple_(best.c.rank, best.c.ticket_id) < tuple_(cast(rank, REAL), id)
+            )
+        page = (
+            page.order_by(best.c.rank.desc(), best.c.ticket_id.desc())
+            .limit(limit + 1)
+            .subquery("page")
+        )
+
+        # The text is customer input: escaped first, so the <mark> tags
+        # added here are the only markup in the snippet.
+        snippet = ts_headline(
+            SEARCH_CONFIG,
+            _escape_html(func.coalesce(Message.content, Ticket.description)),
+            tsquery,
+            "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15",
+        )
+        return (
+            select(Ticket, page.c.rank, page.c.message_id, snippet)
+            .join(page, page.c.ticket_id == Ticket.id)
+            .outerjoin(Message, Message.id == page.c.message_id)
+            .order_by(page.c.rank.desc(), page.c.ticket_id.desc())
+        )
+
+    @staticmethod
+    def _id_in(column, ids: List[UUID]):
+        # `= ANY(:ids)` binds the whole list as one array parameter, however
+        # many ids there are (an IN list would bind one parameter per id).
+        return column == any_(bindparam("ids", ids, type_=ARRAY(PG_UUID(as_uuid=True))))
+
+    async def get_existing_ids(self, ticket_ids: List[UUID]) -> List[UUID]:
+        stmt = select(Ticket.id).where(self._id_in(Ticket.id, ticket_ids))
+        return list(await self.db.scalars(stmt))
+
+    async def bulk_update(self, ticket_ids: List[UUID], values: Dict[str, Any]) -> List[UUID]:
+        """Apply `values` to every listed ticket in one statement.
+
+        Returns the ids that were updated; the rest do not exist.
+        """
+        stmt = self._update_counted(
+            [self._id_in(Ticket.id, ticket_ids)],
+            self._column_values(values),
+            Ticket.id,
+            Ticket.user_id,
+            Ticket.status,
+            Ticket.created_at,
+            Ticket.first_response_at,
+        ).execution_options(synchronize_session=False)
+        rows = (await self.db.execute(stmt)).all()
+        await self.stats.update_tickets(
+            (row, row.previous_user_id, row.previous_status) for row in rows
+        )
+        return [row.id for row in rows]
+
+    async def bulk_add_messages(self, rows: List[Dict[str, Any]]) -> None:
+        # Ids and timestamps are filled in here so the rows go out as one
+        # executemany (batched into multi-row INSERTs) with no RETURNING.
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row.setdefault("id", uuid.uuid4())
+            row.setdefault("status", MessageStatus.COMPLETE)
+            row.setdefault("created_at", now)
+            row.setdefault("updated_at", now)
+        await self.db.execute(insert(Message.__table__), rows)
+
+        ticket_ids = list({row["ticket_id"] for row in rows})
+        owners = dict(
+            (
+                await self.db.execute(
+                    select(Ticket.id, Ticket.user_id).where(self._id_in(Ticket.id, ticket_ids))
+                )
+            ).all()
+        )
+        await self.stats.add_messages(
+            Counter((owners.get(row["ticket_id"]), bool(row.get("is_ai"))) for row in rows)
+        )
+        await self._touch(self._id_in(Ticket.id, ticket_ids), now)
+        replied = list({row["ticket_id"] for row in rows if row.get("is_ai")})
+        if replied:
+            await self._record_first_responses(self._id_in(Ticket.id, replied), now)
+
+    async def add_message(
+        self,
+        ticket_id: UUID,
+        message_in: MessageCreate,
+        status: str = MessageStatus.COMPLETE,
+    ) -> Message:
+        now = datetime.now(timezone.utc)
+        stmt = insert(Message.__table__).values(
+            id=uuid.uuid4(),
             content=message_in.content,
             is_ai=message_in.is_ai,
             ticket_id=ticket_id,
+            status=status,
+            created_at=now,
+            updated_at=now,
+        )
+        return await self._insert_message(stmt)
+
+    async def append_message_content(
+        self, message_id: UUID, content: str, status: Optional[str] = None
+    ) -> None:
+        values = {"content": Message.content + content}
+        if status is not None:
+            values["status"] = status
+        await self._update_message(message_id, values)
+
+    async def set_message_content(self, message_id: UUID, content: str, status: str) -> bool:
+        """Replace a message's content; False if the message no longer exists."""
+        return await self._update_message(message_id, {"content": content, "status": status})
+
+    async def truncate_stale_messages(self, updated_before: datetime) -> int:
+        """Mark replies left streaming since before `updated_before` truncated.
+
+        Returns how many were marked; their tickets' updated_at moves in the
+        same statement.
+        """
+        now = datetime.now(timezone.utc)
+        truncated = (
+            update(Message.__table__)
+            .where(
+                Message.status == MessageStatus.STREAMING,
+                Message.updated_at < updated_before,
+            )
+            .values(status=MessageStatus.TRUNCATED, updated_at=now)
+            .returning(Message.ticket_id)
+            .cte("truncated")
+        )
+        touched = (
+            update(Ticket)
+            .where(Ticket.id.in_(select(truncated.c.ticket_id)))
+            .values(updated_at=now)
+            .cte("touched")
+        )
+        stmt = select(func.count()).select_from(truncated).add_cte(touched)
+        return await self.db.scalar(stmt)
+
+    async def _update_message(self, message_id: UUID, values: Dict[str, Any]) -> bool:
+        # The message and its ticket's updated_at change in one statement, so
+        # a streaming checkpoint stays a single round-trip.
+        now = datetime.now(timezone.utc)
+        updated = (
+            update(Message.__table__)
+            .where(Message.id == message_id)
+            .values(updated_at=now, **values)
+            .returning(Message.ticket_id)
+            .cte("updated")
+        )
+        stmt = (
+            update(Ticket)
+            .where(Ticket.id == updated.c.ticket_id)
+            .values(updated_at=now)
+            .returning(Ticket.id)
+            .execution_options(synchronize_session=False)
         )
-        self.db.add(message)
-        await self.db.commit()
-        await self.db.refresh(message)
-        return message
\ No newline at end of file
+        return await self.db.scalar(stmt) is not None
@@ -0,0 +1,337 @@
+from bisect import bisect_right
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    Date,
+    Table,
+    and_,
+    case,
+    cast,
+    func,
+    literal,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import (
+    FirstResponseCount,
+    Message,
+    Ticket,
+    TicketReplyCount,
+    TicketStatusCount,
+)
+
+# Exclusive upper bounds, in seconds, of the first-response histogram
+# buckets; a last bucket holds everything slower.
+FIRST_RESPONSE_BUCKETS = (10, 30, 60, 300, 900, 3600, 4 * 3600, 24 * 3600)
+
+
+def first_response_bucket(created_at: datetime, first_response_at: datetime) -> int:
+    # The columns hold naive UTC; values fresh from Python may be aware.
+    elapsed = first_response_at.replace(tzinfo=None) - created_at.replace(tzinfo=None)
+    seconds = elapsed.total_seconds()
+    return bisect_right(FIRST_RESPONSE_BUCKETS, seconds)
+
+
+def _first_response_bucket_sql(created_at, first_response_at):
+    # first_response_bucket, computed by the database.
+    seconds = func.extract("epoch", first_response_at - created_at)
+    return case(
+        *((seconds < bound, index) for index, bound in enumerate(FIRST_RESPONSE_BUCKETS)),
+        else_=len(FIRST_RESPONSE_BUCKETS),
+    )
+
+
+def _accumulate(stmt, keys: List[str], counters: List[str]):
+    # ON CONFLICT adds the new deltas to the existing counters.
+    table = stmt.table
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={column: table.c[column] + stmt.excluded[column] for column in counters},
+    )
+
+
+class TicketStatsRepository:
+    """Summary counters behind the ticket dashboards.
+
+    Writers apply deltas with INSERT ... ON CONFLICT DO UPDATE, so a
+    dashboard read only aggregates a handful of rows per user instead of
+    every ticket and message. Like the other repositories it never commits:
+    the counters change in the same transaction as the rows they count.
+    """
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def _increment(
+        self, table: Table, keys: List[str], rows: List[Dict]
+    ) -> None:
+        if not rows:
+            return
+        counters = [column for column in rows[0] if column not in keys]
+        await self.db.execute(_accumulate(pg_insert(table), keys, counters), rows)
+
+    async def add_tickets(self, deltas: Counter) -> None:
+        """Apply `{(user_id, status, created_on): delta}` to the status counts."""
+        rows = [
+            {"user_id": user_id, "status": status, "created_on": created_on, "count": delta}
+            for (user_id, status, created_on), delta in deltas.items()
+            if delta and user_id is not None and status is not None
+        ]
+        await self._increment(
+            TicketStatusCount.__table__, ["user_id", "status", "created_on"], rows
+        )
+
+    async def add_messages(self, deltas: Counter) -> None:
+        """Apply `{(user_id, is_ai): delta}` to the message counts."""
+        totals: Dict[UUID, Dict] = {}
+        for (user_id, is_ai), delta in deltas.items():
+            if not delta or user_id is None:
+                continue
+            row = totals.setdefault(
+                user_id, {"user_id": user_id, "ai_messages": 0, "human_messages": 0}
+            )
+            row["ai_messages" if is_ai else "human_messages"] += delta
+        await self._increment(TicketReplyCount.__table__, ["user_id"], list(totals.values()))
+
+    @staticmethod
+    def count_new_messages(added) -> Tuple:
+        """Counter upserts for new messages, as CTEs to attach to the write.
+
+        `added` yields one row per new message with the ticket's `user_id`
+        and `created_at`, the message's `is_ai` and `at` (its creation
+        time), and `first_response`: whether it is the ticket's first AI
+        reply. Running the upserts inside the statement that adds the
+        message saves a round-trip per counter.
+        """
+        replies = pg_insert(TicketReplyCount.__table__).from_select(
+            ["user_id", "ai_messages", "human_messages"],
+            select(
+                added.c.user_id,
+                case((added.c.is_ai.is_(True), 1), else_=0),
+                case((added.c.is_ai.is_(True), 0), else_=1),
+            ).where(added.c.user_id.is_not(None)),
+        )
+        first_responses = pg_insert(FirstResponseCount.__table__).from_select(
+            ["user_id", "bucket", "count"],
+            select(
+                added.c.user_id,
+                _first_response_bucket_sql(added.c.created_at, added.c.at),
+                literal(1),
+            ).where(added.c.user_id.is_not(None), added.c.first_response.is_(True)),
+        )
+        return (
+            _accumulate(replies, ["user_id"], ["ai_messages", "human_messages"]).cte(
+                "counted_replies"
+            ),
+            _accumulate(first_responses, ["user_id", "bucket"], ["count"]).cte(
+                "counted_first_responses"
+            ),
+        )
+
+    async def add_first_responses(self, deltas: Counter) -> None:
+        """Apply `{(user_id, bucket): delta}` to the first-response histogram."""
+        rows = [
+            {"user_id": user_id, "bucket": bucket, "count": delta}
+            for (user_id, bucket), delta in deltas.items()
+            if delta and user_id is not None
+        ]
+        await self._increment(FirstResponseCount.__table__, ["user_id", "bucket"], rows)
+
+    async def remove_tickets(self, tickets: Iterable[Ticket]) -> None:
+        """Take tickets, and the messages on them, out of the counters."""
+        await self._shift(
+            [(ticket, ticket.user_id, ticket.status, -1) for ticket in tickets],
+            with_replies=True,
+        )
+
+    async def update_tickets(
+        self, changes: Iterable[Tuple[Ticket, Optional[UUID], Optional[str]]]
+    ) -> None:
+        """Move updated tickets between counters.
+
+        `changes` holds each updated ticket (or a row with the same
+        attributes) with its previous owner and status. A new owner takes
+        over the ticket's messages and first response as well.
+        """
+        status_changes, owner_changes = [], []
+        for ticket, user_id, status in changes:
+            entries = [(ticket, user_id, status, -1), (ticket, ticket.user_id, ticket.status, 1)]
+            if user_id != ticket.user_id:
+                owner_changes.extend(entries)
+            elif status != ticket.status:
+                status_changes.extend(entries)
+        await self._shift(status_changes, with_replies=False)
+        await self._shift(owner_changes, with_replies=True)
+
+    async def _shift(
+        self, entries: List[Tuple[Ticket, Optional[UUID], Optional[str], int]], with_replies: bool
+    ) -> None:
+        if not entries:
+            return
+        ticket_counts: Counter = Counter()
+        first_responses: Counter = Counter()
+        for ticket, user_id, status, sign in entries:
+            ticket_counts[(user_id, status, ticket.created_at.date())] += sign
+            if with_replies and ticket.first_response_at is not None:
+                bucket = first_response_bucket(ticket.created_at, ticket.first_response_at)
+                first_responses[(user_id, bucket)] += sign
+        await self.add_tickets(ticket_counts)
+        if not with_replies:
+            return
+
+        stmt = (
+            select(Message.ticket_id, Message.is_ai, func.count())
+            .where(Message.ticket_id.in_({ticket.id for ticket, *_ in entries}))
+            .group_by(Message.ticket_id, Message.is_ai)
+        )
+        per_ticket = {
+            (ticket_id, bool(is_ai)): count
+            for ticket_id, is_ai, count in await self.db.execute(stmt)
+        }
+        messages: Counter = Counter()
+        for ticket, user_id, _, sign in entries:
+            for is_ai in (True, False):
+                messages[(user_id, is_ai)] += sign * per_ticket.get((ticket.id, is_ai), 0)
+        await self.add_messages(messages)
+        await self.add_first_responses(first_responses)
+
+    async def get_stats(
+        self, user_id: Optional[UUID] = None
+    ) -> Tuple[List[Tuple[str, date, int]], Tuple[int, int], Dict[int, int]]:
+        """Raw counters for one user, or summed over everyone.
+
+        Returns (status, created_on, count) rows, the (AI, human) message
+        counts and the first-response histogram as {bucket: count}.
+        """
+        status_stmt = select(
+            TicketStatusCount.status,
+            TicketStatusCount.created_on,
+            func.sum(TicketStatusCount.count),
+        ).group_by(TicketStatusCount.status, TicketStatusCount.created_on)
+        reply_stmt = select(
+            func.coalesce(func.sum(TicketReplyCount.ai_messages), 0),
+            func.coalesce(func.sum(TicketReplyCount.human_messages), 0),
+        )
+        first_response_stmt = select(
+            FirstResponseCount.bucket, func.sum(FirstResponseCount.count)
+        ).group_by(FirstResponseCount.bucket)
+        if user_id is not None:
+            status_stmt = status_stmt.where(TicketStatusCount.user_id == user_id)
+            reply_stmt = reply_stmt.where(TicketReplyCount.user_id == user_id)
+            first_response_stmt = first_response_stmt.where(
+                FirstResponseCount.user_id == user_id
+            )
+
+        statuses = [
+            (status, created_on, int(count))
+            for status, created_on, count in await self.db.execute(status_stmt)
+            if count
+        ]
+        ai_messages, human_messages = (await self.db.execute(reply_stmt)).one()
+        first_responses = {
+            bucket: int(count)
+            for bucket, count in await self.db.execute(first_response_stmt)
+            if count
+        }
+        return statuses, (int(ai_messages), int(human_messages)), first_responses
+
+    async def _correct(
+        self, table: Table, keys: List[str], counters: List[str], actual
+    ) -> None:
+        # Counted and stored values are read in one statement, from one
+        # snapshot, and only the difference is added: a write committed
+        # meanwhile keeps its own delta, and one still in flight holds its
+        # counter rows until it commits, so nothing is lost or counted twice.
+        actual = actual.subquery("actual")
+        stored = table.alias("stored")
+        deltas = [
+            func.coalesce(actual.c[column], 0) - func.coalesce(stored.c[column], 0)
+            for column in counters
+        ]
+        corrections = (
+            select(
+                *(func.coalesce(actual.c[key], stored.c[key]) for key in keys),
+                *deltas,
+            )
+            .select_from(
+                actual.join(
+                    stored,
+                    and_(*(actual.c[key] == stored.c[key] for key in keys)),
+                    full=True,
+                )
+            )
+            .where(or_(*(delta != 0 for delta in deltas)))
+        )
+        stmt = pg_insert(table).from_select(keys + counters, corrections)
+        await self.db.execute(_accumulate(stmt, keys, counters))
+
+    async def reconcile(self) -> None:
+        """Correct every counter from the ticket and message tables.
+
+        Each counter table is corrected by a single statement that adds the
+        difference between the counted and stored values. No table is
+        locked, so writers carry on meanwhile; only the counter rows being
+        corrected are locked, and only until the transaction commits.
+        PostgreSQL only.
+        """
+        first_ai_reply = (
+            select(func.min(Message.created_at))
+            .where(Message.ticket_id == Ticket.id, Message.is_ai.is_(True))
+            .scalar_subquery()
+        )
+        await self.db.execute(
+            update(Ticket)
+            .where(Ticket.first_response_at.is_distinct_from(first_ai_reply))
+            .values(first_response_at=first_ai_reply, updated_at=Ticket.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+
+        created_on = cast(Ticket.created_at, Date)
+        await self._correct(
+            TicketStatusCount.__table__,
+            ["user_id", "status", "created_on"],
+            ["count"],
+            select(
+                Ticket.user_id,
+                Ticket.status,
+                created_on.label("created_on"),
+                func.count().label("count"),
+            )
+            .where(Ticket.user_id.is_not(None), Ticket.status.is_not(None))
+            .group_by(Ticket.user_id, Ticket.status, created_on),
+        )
+        await self._correct(
+            TicketReplyCount.__table__,
+            ["user_id"],
+            ["ai_messages", "human_messages"],
+            select(
+                Ticket.user_id,
+                func.count().filter(Message.is_ai.is_(True)).label("ai_messages"),
+                func.count().filter(Message.is_ai.is_not(True)).label("human_messages"),
+            )
+            .join(Message, Message.ticket_id == Ticket.id)
+            .where(Ticket.user_id.is_not(None))
+            .group_by(Ticket.user_id),
+        )
+
+        bucket = _first_response_bucket_sql(Ticket.created_at, Ticket.first_response_at)
+        responses = (
+            select(Ticket.user_id, bucket.label("bucket"))
+            .where(Ticket.user_id.is_not(None), Ticket.first_response_at.is_not(None))
+            .subquery("responses")
+        )
+        await self._correct(
+            FirstResponseCount.__table__,
+            ["user_id", "bucket"],
+            ["count"],
+            select(
+                responses.c.user_id, responses.c.bucket, func.count().label("count")
+            ).group_by(responses.c.user_id, responses.c.bucket),
+        )
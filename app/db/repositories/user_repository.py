@@ -1,7 +1,10 @@
-from typing import Optional
-from sqlalchemy import select
+from typing import Any, Dict, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import event, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.user_cache import invalidate_user
 from app.db.models import User
 from app.db.repositories.base import BaseRepository
 from app.api.schemas.user import UserCreate, UserUpdate
@@ -14,4 +17,27 @@ class UserRepository(BaseRepository[User, UserCreate, UserUpdate]):
     async def get_by_email(self, email: str) -> Optional[User]:
         stmt = select(User).where(User.email == email)
         result = await self.db.execute(stmt)
-        return result.scalars().first()
\ No newline at end of file
+        return result.scalars().first()
+
+    async def update(
+        self, *, db_obj: User, obj_in: Union[UserUpdate, Dict[str, Any]]
+    ) -> User:
+        user = await super().update(db_obj=db_obj, obj_in=obj_in)
+        self._invalidate_on_commit(user.id)
+        return user
+
+    async def delete(self, *, id: Union[UUID, str]) -> Optional[User]:
+        user = await super().delete(id=id)
+        self._invalidate_on_commit(id)
+        return user
+
+    def _invalidate_on_commit(self, user_id: Union[UUID, str]) -> None:
+        # Cached principals carry the role, so drop them on every change, but
+        # only once it is committed: dropped any earlier, a concurrent request
+        # could cache the old row again before the commit lands.
+        event.listen(
+            self.db.sync_session,
+            "after_commit",
+            lambda session: invalidate_user(user_id),
+            once=True,
+        )
@@ -1,12 +1,60 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
 from app.api.routes import api_router
 from app.core.config import settings
+from app.core.instrumentation import (
+    PROMETHEUS_CONTENT_TYPE,
+    InstrumentationMiddleware,
+    registry,
+)
+from app.core.security import password_hasher
+from app.services.ai_service import AIService
+from app.services.generation_scheduler import GenerationScheduler
+from app.services.stream_broadcaster import StreamBroadcaster
+from app.workers.ai_jobs import AIJobWorker
+from app.workers.stale_streams import StaleStreamSweeper
+from app.workers.ticket_stats import TicketStatsReconciler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.generation_scheduler = GenerationScheduler()
+    app.state.ai_service = AIService(scheduler=app.state.generation_scheduler)
+    app.state.reply_broadcaster = StreamBroadcaster()
+    ai_job_worker = None
+    if settings.AI_JOB_INPROCESS_WORKERS > 0:
+        ai_job_worker = AIJobWorker(
+            app.state.ai_service, concurrency=settings.AI_JOB_INPROCESS_WORKERS
+        )
+        ai_job_worker.start()
+    stale_stream_sweeper = None
+    if settings.AI_STREAM_SWEEP_SECONDS > 0:
+        stale_stream_sweeper = StaleStreamSweeper()
+        stale_stream_sweeper.start()
+    stats_reconciler = None
+    if settings.TICKET_STATS_RECONCILE_SECONDS > 0:
+        stats_reconciler = TicketStatsReconciler()
+        stats_reconciler.start()
+    yield
+    if stats_reconciler is not None:
+        await stats_reconciler.stop()
+    if stale_stream_sweeper is not None:
+        await stale_stream_sweeper.stop()
+    if ai_job_worker is not None:
+        await ai_job_worker.stop()
+    await app.state.reply_broadcaster.aclose()
+    await app.state.ai_service.aclose()
+    password_hasher.shutdown()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 # Set all CORS enabled origins
@@ -17,10 +65,21 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Server-Timing", "ETag"],
     )
 
+# Added last so it wraps everything else, CORS included.
+app.add_middleware(InstrumentationMiddleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 @app.get("/health-check")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+
+if settings.PROMETHEUS_METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
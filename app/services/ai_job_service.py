@@ -0,0 +1,52 @@
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.ai_job import AIJob, AIJobCreate
+from app.core.exceptions import (
+    AIJobNotFoundException,
+    AIJobPendingException,
+    InvalidWebhookException,
+)
+from app.core.user_cache import UserPrincipal
+from app.core.webhooks import WebhookTargetError, check_webhook_url
+from app.db.repositories.ai_job_repository import AIJobRepository
+from app.services.ticket_service import TicketService
+
+
+class AIJobService:
+    def __init__(self, db: AsyncSession):
+        self.ai_job_repository = AIJobRepository(db)
+        self.ticket_service = TicketService(db)
+
+    async def enqueue(
+        self, user: UserPrincipal, ticket_id: UUID, job_in: AIJobCreate
+    ) -> AIJob:
+        await self.ticket_service.get_ticket(user, ticket_id)
+        webhook_url = str(job_in.webhook_url) if job_in.webhook_url else None
+        if webhook_url is not None:
+            try:
+                await check_webhook_url(webhook_url)
+            except WebhookTargetError as exc:
+                raise InvalidWebhookException(str(exc))
+        # A reply already pending for the ticket will answer the same
+        # messages, so hand that job back instead of queueing another, as
+        # long as that does not drop the caller's webhook.
+        job = await self.ai_job_repository.get_pending_for_ticket(ticket_id)
+        if job is not None:
+            if webhook_url is not None and webhook_url != job.webhook_url:
+                raise AIJobPendingException()
+            return job
+        return await self.ai_job_repository.create(
+            obj_in={"ticket_id": ticket_id, "user_id": user.id, "webhook_url": webhook_url}
+        )
+
+    async def get_job(self, user: UserPrincipal, ticket_id: UUID, job_id: UUID) -> AIJob:
+        job = await self.ai_job_repository.get_by_id_owned(
+            job_id, ticket_id, self.ticket_service._owner_scope(user)
+        )
+        if job is None:
+            # Report a missing or forbidden ticket before a missing job.
+            await self.ticket_service.get_ticket(user, ticket_id)
+            raise AIJobNotFoundException()
+        return job
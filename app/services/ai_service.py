@@ -1,47 +1,187 @@
+import asyncio
+import importlib.util
 import json
-from typing import AsyncGenerator, Dict, List
+import time
+from dataclasses import dataclass
+from typing import AsyncGenerator, Dict, List, Optional, Sequence
+from uuid import UUID
 
 import groq
+import httpx
 
 from app.core.config import settings
+from app.core.instrumentation import (
+    LLM_TIME_TO_FIRST_TOKEN_SECONDS,
+    LLM_TOKENS_PER_SECOND,
+)
+from app.services.context_builder import ContextBuilder
+from app.services.generation_scheduler import GenerationScheduler, parse_retry_after
+from app.services.response_cache import ResponseCache, replay_chunks
 from app.templates.prompts import support_prompt_template
 
 
+def _build_http_client() -> httpx.AsyncClient:
+    # HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 keep-alive.
+    http2 = settings.GROQ_HTTP2 and importlib.util.find_spec("h2") is not None
+    return groq.DefaultAsyncHttpxClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+@dataclass
+class ReplyPrompt:
+    message_id: UUID
+    latest_message: str
+    message_history: List[Dict]
+
+
+def build_reply_prompt(messages: Sequence) -> Optional[ReplyPrompt]:
+    """The latest customer message and the history before it, or None if
+    the customer has not written anything yet."""
+    customer_messages = [msg for msg in messages if not msg.is_ai]
+    if not customer_messages:
+        return None
+    latest = customer_messages[-1]
+    return ReplyPrompt(
+        message_id=latest.id,
+        latest_message=latest.content,
+        message_history=[
+            {"id": msg.id, "content": msg.content, "is_ai": msg.is_ai}
+            for msg in messages
+            if msg.id != latest.id
+        ],
+    )
+
+
 class AIService:
-    def __init__(self):
-        self.client = groq.AsyncGroq(api_key=settings.GROQ_API_KEY)
+    """Adapter over the Groq API.
+
+    Create one instance per process (see the app lifespan) so every reply
+    reuses the same pooled, kept-alive connections.
+    """
+
+    def __init__(
+        self,
+        client: Optional[groq.AsyncGroq] = None,
+        context_builder: Optional[ContextBuilder] = None,
+        response_cache: Optional[ResponseCache] = None,
+        scheduler: Optional[GenerationScheduler] = None,
+    ):
+        # Retries happen in _create_stream rather than in the SDK, so on a
+        # 429 the scheduler can hold back other generations for as long as
+        # Groq asks us to.
+        self.client = client or groq.AsyncGroq(
+            api_key=settings.GROQ_API_KEY,
+            base_url=settings.GROQ_BASE_URL,
+            http_client=_build_http_client(),
+            max_retries=0,
+        )
+        self.scheduler = scheduler
         self.model = settings.GROQ_MODEL_NAME
+        self.context_builder = context_builder or ContextBuilder()
+        if response_cache is None and settings.AI_RESPONSE_CACHE_ENABLED:
+            response_cache = ResponseCache()
+        self.response_cache = response_cache
+
+    async def aclose(self) -> None:
+        await self.client.close()
 
     async def generate_response_stream(
-        self, ticket_description: str, message_history: List[Dict], latest_message: str
+        self,
+        ticket_description: str,
+        message_history: List[Dict],
+        latest_message: str,
+        ticket_id: Optional[UUID] = None,
+        owner_id: Optional[UUID] = None,
     ) -> AsyncGenerator[str, None]:
+        # Only first replies are cached: later ones depend on the conversation.
+        cacheable = self.response_cache is not None and not message_history
+        if cacheable:
+            cached = self.response_cache.get(
+                ticket_description, latest_message, owner_id=owner_id
+            )
+            if cached is not None:
+                for chunk in replay_chunks(cached):
+                    yield chunk
+                return
+
         # Format the prompt using the template
         prompt = support_prompt_template.format(
             ticket_description=ticket_description,
-            message_history=self._format_message_history(message_history),
+            message_history=self._format_message_history(message_history, ticket_id),
             latest_message=latest_message,
         )
 
         # Generate streaming response from Groq
-        stream = await self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            stream=True,
-            max_tokens=2048,
-        )
+        started = time.perf_counter()
+        stream = await self._create_stream(prompt)
 
         # Yield chunks as they come in
+        chunks = []
+        first_token_at = None
+        completion_tokens = None
         async for chunk in stream:
-            if chunk.choices[0].delta.content:
+            # Groq reports usage on the final chunk.
+            usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+            if usage is not None:
+                completion_tokens = usage.completion_tokens
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(
+                        first_token_at - started, model=self.model
+                    )
+                chunks.append(chunk.choices[0].delta.content)
                 yield chunk.choices[0].delta.content
 
-    def _format_message_history(self, messages: List[Dict]) -> str:
-        if not messages:
-            return "No previous messages"
-        
-        formatted_history = ""
-        for msg in messages:
-            sender_type = "AI assistant" if msg["is_ai"] else "Customer"
-            formatted_history += f"{sender_type}: {msg['content']}\n"
-        
-        return formatted_history.strip()
\ No newline at end of file
+        if first_token_at is not None:
+            elapsed = time.perf_counter() - first_token_at
+            # Without usage, each content chunk is close to one token.
+            tokens = completion_tokens or len(chunks)
+            if tokens > 1 and elapsed > 0:
+                LLM_TOKENS_PER_SECOND.observe((tokens - 1) / elapsed, model=self.model)
+
+        # An empty completion is a failure, not an answer worth replaying.
+        if cacheable and chunks:
+            self.response_cache.set(
+                ticket_description, latest_message, "".join(chunks), owner_id=owner_id
+            )
+
+    async def _create_stream(self, prompt: str):
+        attempt = 0
+        while True:
+            try:
+                return await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    stream=True,
+                    max_tokens=2048,
+                )
+            except (
+                groq.RateLimitError,
+                groq.APIConnectionError,
+                groq.InternalServerError,
+            ) as exc:
+                if attempt >= settings.GROQ_RATE_LIMIT_RETRIES:
+                    raise
+                delay = None
+                if isinstance(exc, groq.RateLimitError):
+                    delay = parse_retry_after(exc.response.headers)
+                if delay is None:
+                    delay = 2 ** attempt
+                delay = min(delay, settings.GROQ_RATE_LIMIT_MAX_BACKOFF_SECONDS)
+                # Only a 429 is about our rate; other errors retry on their own.
+                if self.scheduler is not None and isinstance(exc, groq.RateLimitError):
+                    self.scheduler.pause(delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    def _format_message_history(
+        self, messages: List[Dict], ticket_id: Optional[UUID] = None
+    ) -> str:
+        return self.context_builder.build(messages, ticket_id=ticket_id)
\ No newline at end of file
@@ -3,7 +3,11 @@ from typing import Optional
 from app.api.schemas.user import User, UserCreate
 from app.core.config import settings
 from app.core.exceptions import IncorrectCredentialsException, UserAlreadyExistsException
-from app.core.security import create_access_token, get_password_hash, verify_password
+from app.core.security import (
+    create_access_token,
+    get_password_hash_async,
+    verify_password_async,
+)
 from app.db.repositories.user_repository import UserRepository
 
 
@@ -15,7 +19,7 @@ class AuthService:
         user = await self.user_repository.get_by_email(email=email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         return user
 
@@ -32,9 +36,12 @@ class AuthService:
             raise UserAlreadyExistsException()
         
         # Create new user
-        user_data = user_in.model_dump(exclude={"password"})
-        user_data["hashed_password"] = get_password_hash(user_in.password)
-        user = await self.user_repository.create(obj_in=UserCreate(**user_data))
+        # The role is never taken from the signup body: new accounts are
+        # plain users, and only an admin can promote them.
+        user_data = user_in.model_dump(exclude={"password", "role"})
+        user_data["role"] = "user"
+        user_data["hashed_password"] = await get_password_hash_async(user_in.password)
+        user = await self.user_repository.create(obj_in=user_data)
         return user
 
     async def login(self, email: str, password: str) -> str:
@@ -0,0 +1,126 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token for English text, which is close
+    # enough for budgeting without pulling in a tokenizer.
+    return len(text) // 4 + 1
+
+
+# A message's id and the hash of its content: a message still streaming or
+# later edited keeps its id, and must render again when its content changes.
+_MessageKey = Tuple[UUID, int]
+
+
+@dataclass
+class _RenderedHistory:
+    keys: List[_MessageKey] = field(default_factory=list)
+    lines: List[str] = field(default_factory=list)
+    condensed: List[str] = field(default_factory=list)
+    tokens: List[int] = field(default_factory=list)
+    condensed_tokens: List[int] = field(default_factory=list)
+
+
+class ContextBuilder:
+    """Renders a ticket's message history into a token-budgeted prompt section.
+
+    The newest `verbatim_messages` are kept word for word, older ones are
+    condensed to a short excerpt, and whatever no longer fits the budget is
+    dropped. Rendered lines are cached per ticket, so a new message only
+    renders itself instead of the whole conversation.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = settings.AI_CONTEXT_TOKEN_BUDGET,
+        verbatim_messages: int = settings.AI_CONTEXT_VERBATIM_MESSAGES,
+        condensed_chars: int = settings.AI_CONTEXT_CONDENSED_CHARS,
+        cache_size: int = settings.AI_CONTEXT_CACHE_SIZE,
+        cache_ttl: float = settings.AI_CONTEXT_CACHE_TTL_SECONDS,
+    ):
+        self.token_budget = token_budget
+        self.verbatim_messages = verbatim_messages
+        self.condensed_chars = condensed_chars
+        self._cache: TTLCache[UUID, _RenderedHistory] = TTLCache(cache_size, cache_ttl)
+
+    def build(self, messages: List[Dict], ticket_id: Optional[UUID] = None) -> str:
+        if not messages:
+            return "No previous messages"
+
+        history = self._render(messages, ticket_id)
+        remaining = self.token_budget
+        selected: List[str] = []
+        for age, index in enumerate(range(len(history.lines) - 1, -1, -1)):
+            if age < self.verbatim_messages and history.tokens[index] <= remaining:
+                selected.append(history.lines[index])
+                remaining -= history.tokens[index]
+            elif history.condensed_tokens[index] <= remaining:
+                selected.append(history.condensed[index])
+                remaining -= history.condensed_tokens[index]
+            else:
+                break
+
+        omitted = len(history.lines) - len(selected)
+        if omitted:
+            selected.append(f"[{omitted} earlier messages omitted]")
+        selected.reverse()
+        return "\n".join(selected)
+
+    def _render(self, messages: List[Dict], ticket_id: Optional[UUID]) -> _RenderedHistory:
+        keys = [(msg.get("id"), hash(msg["content"])) for msg in messages]
+        cacheable = ticket_id is not None and all(key[0] is not None for key in keys)
+
+        history = self._cache.get(ticket_id) if cacheable else None
+        if history is not None:
+            history = self._align(history, keys)
+        if history is None:
+            history = _RenderedHistory()
+
+        for msg, key in zip(messages[len(history.keys):], keys[len(history.keys):]):
+            sender_type = "AI assistant" if msg["is_ai"] else "Customer"
+            content = msg["content"].strip()
+            line = f"{sender_type}: {content}"
+            if len(content) > self.condensed_chars:
+                condensed = f"{sender_type}: {content[: self.condensed_chars].rstrip()}..."
+            else:
+                condensed = line
+            history.keys.append(key)
+            history.lines.append(line)
+            history.condensed.append(condensed)
+            history.tokens.append(estimate_tokens(line))
+            history.condensed_tokens.append(estimate_tokens(condensed))
+
+        if cacheable:
+            self._cache.set(ticket_id, history)
+        return history
+
+    @staticmethod
+    def _align(
+        history: _RenderedHistory, keys: List[_MessageKey]
+    ) -> Optional[_RenderedHistory]:
+        # Callers pass a sliding window of the newest messages, so the cached
+        # render may start earlier than `keys`; keep the overlapping part, up
+        # to the first message whose content has changed since.
+        try:
+            start = history.keys.index(keys[0])
+        except ValueError:
+            return None
+        end = start
+        for key in keys:
+            if end == len(history.keys) or history.keys[end] != key:
+                break
+            end += 1
+        if start == 0 and end == len(history.keys):
+            return history
+        return _RenderedHistory(
+            keys=history.keys[start:end],
+            lines=history.lines[start:end],
+            condensed=history.condensed[start:end],
+            tokens=history.tokens[start:end],
+            condensed_tokens=history.condensed_tokens[start:end],
+        )
@@ -0,0 +1,236 @@
+import asyncio
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, Hashable, Mapping, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.exceptions import (
+    GenerationQueueFullException,
+    GenerationQueueTimeoutException,
+    GenerationRateLimitedException,
+)
+
+_DURATION = re.compile(r"([\d.]+)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+    """Seconds to wait according to Groq's rate-limit response headers.
+
+    Understands `retry-after` (seconds) and the `x-ratelimit-reset-*`
+    durations Groq sends, such as "7.66s" or "2m59.56s".
+    """
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+
+    delays = []
+    for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        value = headers.get(name)
+        if value:
+            delays.append(
+                sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in _DURATION.findall(value))
+            )
+    return max(delays) if delays else None
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success, else seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class GenerationSlot:
+    """Permission to run one generation. Releasing it is idempotent."""
+
+    def __init__(self, scheduler: "GenerationScheduler", wait_seconds: float):
+        self.scheduler = scheduler
+        self.wait_seconds = wait_seconds
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.scheduler._release()
+
+    async def hold(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Pass `chunks` through, releasing the slot once the stream ends."""
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            self.release()
+
+
+class GenerationScheduler:
+    """Admission control for LLM generations.
+
+    Each user draws from a token bucket (`user_rate` generations per second,
+    bursting to `user_burst`); an empty bucket is rejected with a 429 right
+    away. Admitted requests run while fewer than `max_concurrency`
+    generations are active and otherwise wait in a bounded queue for at most
+    `queue_timeout` seconds. Waiting users are served round-robin, so one
+    user's backlog cannot starve everyone else. When Groq rate-limits us,
+    `pause` stops handing out slots until its reset time has passed.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = settings.AI_MAX_CONCURRENT_GENERATIONS,
+        max_queue: int = settings.AI_GENERATION_QUEUE_SIZE,
+        queue_timeout: float = settings.AI_GENERATION_QUEUE_TIMEOUT_SECONDS,
+        user_rate: float = settings.AI_USER_GENERATIONS_PER_MINUTE / 60,
+        user_burst: int = settings.AI_USER_GENERATION_BURST,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        # An idle bucket is full again after burst / rate seconds, at which
+        # point forgetting it changes nothing.
+        self._buckets: TTLCache[Hashable, TokenBucket] = TTLCache(
+            settings.USER_CACHE_MAX_SIZE,
+            user_burst / user_rate if user_rate > 0 else math.inf,
+        )
+        self._waiters: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._queued = 0
+        self._active = 0
+        self._paused_until = 0.0
+        self._resume_handle: Optional[asyncio.TimerHandle] = None
+        self._admitted = 0
+        self._rejected_rate_limited = 0
+        self._rejected_queue_full = 0
+        self._timed_out = 0
+        self._upstream_rate_limited = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    async def acquire(self, user_id: Hashable) -> GenerationSlot:
+        if self._queued >= self.max_queue:
+            self._rejected_queue_full += 1
+            raise GenerationQueueFullException(retry_after=self._retry_hint())
+
+        if self.user_rate > 0:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = TokenBucket(self.user_rate, self.user_burst)
+                self._buckets.set(user_id, bucket)
+            retry_after = bucket.take()
+            if retry_after:
+                self._rejected_rate_limited += 1
+                raise GenerationRateLimitedException(retry_after=math.ceil(retry_after))
+
+        started = time.perf_counter()
+        if not self._queued and self._can_dispatch():
+            self._active += 1
+            return self._admit(started)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(user_id, deque()).append(waiter)
+        self._queued += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out += 1
+            self._forget(user_id, waiter)
+            raise GenerationQueueTimeoutException(retry_after=self._retry_hint())
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller went away.
+                self._release()
+            else:
+                self._forget(user_id, waiter)
+            raise
+        return self._admit(started)
+
+    def pause(self, seconds: float) -> None:
+        self._upstream_rate_limited += 1
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "queued_users": len(self._waiters),
+            "max_queue": self.max_queue,
+            "paused_seconds": max(self._paused_until - time.monotonic(), 0.0),
+            "admitted": self._admitted,
+            "rejected_rate_limited": self._rejected_rate_limited,
+            "rejected_queue_full": self._rejected_queue_full,
+            "timed_out": self._timed_out,
+            "upstream_rate_limited": self._upstream_rate_limited,
+            "wait_seconds_avg": (
+                self._wait_seconds_total / self._admitted if self._admitted else 0.0
+            ),
+            "wait_seconds_max": self._wait_seconds_max,
+        }
+
+    def _admit(self, started: float) -> GenerationSlot:
+        waited = time.perf_counter() - started
+        self._admitted += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        return GenerationSlot(self, waited)
+
+    def _can_dispatch(self) -> bool:
+        return self._active < self.max_concurrency and time.monotonic() >= self._paused_until
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _resume(self) -> None:
+        self._resume_handle = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        while self._queued and self._can_dispatch():
+            user_id, waiters = next(iter(self._waiters.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self._waiters.move_to_end(user_id)
+            else:
+                del self._waiters[user_id]
+            self._queued -= 1
+            if not waiter.done():
+                self._active += 1
+                waiter.set_result(None)
+
+        paused_for = self._paused_until - time.monotonic()
+        if self._queued and paused_for > 0 and self._resume_handle is None:
+            self._resume_handle = asyncio.get_running_loop().call_later(
+                paused_for, self._resume
+            )
+
+    def _forget(self, user_id: Hashable, waiter: asyncio.Future) -> None:
+        waiters = self._waiters.get(user_id)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self._queued -= 1
+        if not waiters:
+            del self._waiters[user_id]
+
+    def _retry_hint(self) -> int:
+        return max(math.ceil(self._paused_until - time.monotonic()), 1)
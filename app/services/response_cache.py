@@ -0,0 +1,126 @@
+import hashlib
+import math
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+SparseVector = Dict[int, float]
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+_CHUNKS = re.compile(r"\s*\S+\s*")
+
+
+def normalize(text: str) -> str:
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def fingerprint(ticket_description: str, latest_message: str) -> str:
+    key = f"{normalize(ticket_description)}\x1f{normalize(latest_message)}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def hashed_embedding(text: str, dims: int = 1 << 16) -> SparseVector:
+    """Feature-hashed bag of unigrams and bigrams, L2-normalised.
+
+    A dependency-free stand-in for a sentence embedding model; any callable
+    returning a sparse vector can be passed to `ResponseCache` instead.
+    """
+    words = normalize(text).split()
+    vector: SparseVector = {}
+    for term in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+        digest = hashlib.blake2b(term.encode(), digest_size=8).digest()
+        index = int.from_bytes(digest, "little") % dims
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    return {index: weight / norm for index, weight in vector.items()} if norm else {}
+
+
+def cosine(a: SparseVector, b: SparseVector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(weight * b.get(index, 0.0) for index, weight in a.items())
+
+
+def replay_chunks(text: str) -> List[str]:
+    return _CHUNKS.findall(text)
+
+
+@dataclass
+class _CachedResponse:
+    response: str
+    vector: Optional[SparseVector]
+    owner_id: Optional[UUID]
+
+
+class ResponseCache:
+    """Caches AI replies for repeated (ticket description, message) pairs.
+
+    Lookups first try an exact match on the normalised fingerprint. When a
+    similarity threshold is set, misses fall back to the most similar cached
+    question asked by the same user, found by a scan over the (bounded) set
+    of cached vectors. Near matches never cross users: a similar reply can
+    still carry details from someone else's ticket.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = settings.AI_RESPONSE_CACHE_MAX_SIZE,
+        ttl: float = settings.AI_RESPONSE_CACHE_TTL_SECONDS,
+        similarity_threshold: Optional[float] = settings.AI_RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+        embed: Callable[[str], SparseVector] = hashed_embedding,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        self._entries: TTLCache[str, _CachedResponse] = TTLCache(maxsize, ttl)
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        ticket_description: str,
+        latest_message: str,
+        owner_id: Optional[UUID] = None,
+    ) -> Optional[str]:
+        entry = self._entries.get(fingerprint(ticket_description, latest_message))
+        if entry is None and self.similarity_threshold and owner_id is not None:
+            entry = self._nearest(ticket_description, latest_message, owner_id)
+
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.response
+
+    def set(
+        self,
+        ticket_description: str,
+        latest_message: str,
+        response: str,
+        owner_id: Optional[UUID] = None,
+    ) -> None:
+        vector = None
+        if self.similarity_threshold and owner_id is not None:
+            vector = self.embed(f"{ticket_description}\n{latest_message}")
+        self._entries.set(
+            fingerprint(ticket_description, latest_message),
+            _CachedResponse(response=response, vector=vector, owner_id=owner_id),
+        )
+
+    def _nearest(
+        self, ticket_description: str, latest_message: str, owner_id: UUID
+    ) -> Optional[_CachedResponse]:
+        query = self.embed(f"{ticket_description}\n{latest_message}")
+        best, best_score = None, self.similarity_threshold
+        for _, entry in self._entries.items():
+            if entry.vector is None or entry.owner_id != owner_id:
+                continue
+            score = cosine(query, entry.vector)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
@@ -0,0 +1,150 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+from app.core.config import settings
+from app.core.exceptions import StreamNotAvailableException
+
+
+class _Flight:
+    """One generation's output, kept as a bounded replay log.
+
+    `log` holds the newest chunks; `base_index` and `base_offset` are the
+    sequence number and character offset of its first chunk, which move
+    forward as old chunks are evicted to stay under `max_chars`.
+    """
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.log: Deque[str] = deque()
+        self.base_index = 0
+        self.base_offset = 0
+        self.total = 0
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def end_index(self) -> int:
+        return self.base_index + len(self.log)
+
+    async def publish(self, chunk: Optional[str] = None, done: bool = False) -> None:
+        async with self.changed:
+            if chunk is not None:
+                self.log.append(chunk)
+                self.total += len(chunk)
+                while len(self.log) > 1 and self.total - self.base_offset > self.max_chars:
+                    self.base_offset += len(self.log.popleft())
+                    self.base_index += 1
+            self.done = self.done or done
+            self.changed.notify_all()
+
+    def locate(self, offset: int) -> Optional[Tuple[int, int]]:
+        """Sequence number of the chunk containing `offset` and how far into
+        it the offset falls, or None if that part was already evicted."""
+        if offset < self.base_offset:
+            return None
+        start = self.base_offset
+        for position, chunk in enumerate(self.log):
+            if offset < start + len(chunk):
+                return self.base_index + position, offset - start
+            start += len(chunk)
+        return self.end_index, offset - start
+
+
+class StreamBroadcaster:
+    """Single-flight fan-out of a chunk stream to concurrent subscribers.
+
+    The first subscriber for a key starts the source in a background task;
+    anyone subscribing to the same key attaches to that same stream from a
+    character offset, replayed from the flight's log. The source runs to
+    completion even if every subscriber disconnects, and a finished stream
+    stays available for `retain_seconds` so that clients can reconnect and
+    resume instead of starting another generation.
+    """
+
+    def __init__(
+        self,
+        retain_seconds: float = settings.AI_STREAM_RESUME_TTL_SECONDS,
+        max_replay_chars: int = settings.AI_STREAM_REPLAY_MAX_CHARS,
+    ):
+        self.retain_seconds = retain_seconds
+        self.max_replay_chars = max_replay_chars
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def has_stream(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    def subscribe(
+        self,
+        key: Hashable,
+        source_factory: Callable[[], AsyncIterator[str]],
+        offset: int = 0,
+    ) -> AsyncIterator[str]:
+        flight = self._flights.get(key)
+        if flight is None:
+            if offset:
+                raise StreamNotAvailableException()
+            flight = _Flight(self.max_replay_chars)
+            self._flights[key] = flight
+            flight.task = asyncio.create_task(self._drive(key, flight, source_factory))
+
+        position = flight.locate(offset)
+        if position is None:
+            raise StreamNotAvailableException()
+        return self._follow(flight, *position)
+
+    def in_flight(self) -> int:
+        return sum(1 for flight in self._flights.values() if not flight.done)
+
+    async def aclose(self) -> None:
+        tasks = [flight.task for flight in self._flights.values() if flight.task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._flights.clear()
+
+    async def _drive(
+        self,
+        key: Hashable,
+        flight: _Flight,
+        source_factory: Callable[[], AsyncIterator[str]],
+    ) -> None:
+        try:
+            async for chunk in source_factory():
+                await flight.publish(chunk)
+        except BaseException as exc:
+            flight.error = exc
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+        finally:
+            # Failed streams are dropped straight away so a retry regenerates.
+            if flight.error is None and self.retain_seconds > 0:
+                asyncio.get_running_loop().call_later(
+                    self.retain_seconds, self._expire, key, flight
+                )
+            else:
+                self._expire(key, flight)
+            await flight.publish(done=True)
+
+    def _expire(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def _follow(self, flight: _Flight, index: int, skip: int) -> AsyncIterator[str]:
+        while True:
+            async with flight.changed:
+                await flight.changed.wait_for(lambda: index < flight.end_index or flight.done)
+            while index < flight.end_index:
+                if index < flight.base_index:
+                    raise RuntimeError("AI response stream fell behind its replay log")
+                chunk = flight.log[index - flight.base_index][skip:]
+                skip = 0
+                index += 1
+                if chunk:
+                    yield chunk
+            if flight.done and index >= flight.end_index:
+                if flight.error is not None:
+                    raise RuntimeError("AI response stream failed") from flight.error
+                return
@@ -0,0 +1,105 @@
+import time
+from typing import AsyncIterator, Callable, List, Optional
+from uuid import UUID
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.schemas.ticket import MessageCreate
+from app.core.config import settings
+from app.db.models import MessageStatus
+from app.db.repositories.ticket_repository import TicketRepository
+
+
+class StreamRecorder:
+    """Persists a streamed AI reply while it is still being generated.
+
+    Chunks are buffered in a list and flushed to the reply's `Message` row
+    every `checkpoint_chunks` chunks or `checkpoint_seconds` seconds. Each
+    checkpoint only sends the text produced since the previous one, on its
+    own short-lived session, so no connection is held between checkpoints.
+
+    Pass `message_id` to write the reply into an existing message, such as
+    the truncated one left by a failed earlier attempt; its content is
+    replaced by the first checkpoint.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        ticket_id: UUID,
+        checkpoint_chunks: int = settings.AI_STREAM_CHECKPOINT_CHUNKS,
+        checkpoint_seconds: float = settings.AI_STREAM_CHECKPOINT_SECONDS,
+        message_id: Optional[UUID] = None,
+    ):
+        self.session_factory = session_factory
+        self.ticket_id = ticket_id
+        self.checkpoint_chunks = checkpoint_chunks
+        self.checkpoint_seconds = checkpoint_seconds
+        self.message_id = message_id
+        self._replace = message_id is not None
+        self._chunks: List[str] = []
+        self._flushed = 0
+        self._last_checkpoint = time.monotonic()
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    async def append(self, chunk: str) -> None:
+        self._chunks.append(chunk)
+        if (
+            len(self._chunks) - self._flushed >= self.checkpoint_chunks
+            or time.monotonic() - self._last_checkpoint >= self.checkpoint_seconds
+        ):
+            await self.checkpoint()
+
+    async def checkpoint(self, status: str = MessageStatus.STREAMING) -> None:
+        pending = "".join(self._chunks[self._flushed:])
+        self._flushed = len(self._chunks)
+        self._last_checkpoint = time.monotonic()
+
+        async with self.session_factory() as session, session.begin():
+            ticket_repository = TicketRepository(session)
+            if self._replace:
+                self._replace = False
+                if await ticket_repository.set_message_content(
+                    message_id=self.message_id, content=pending, status=status
+                ):
+                    return
+                # The earlier message is gone; start a new one.
+                self.message_id = None
+            if self.message_id is None:
+                message = await ticket_repository.add_message(
+                    ticket_id=self.ticket_id,
+                    message_in=MessageCreate(content=pending, is_ai=True),
+                    status=status,
+                )
+                self.message_id = message.id
+            else:
+                await ticket_repository.append_message_content(
+                    message_id=self.message_id, content=pending, status=status
+                )
+
+    async def finish(self, truncated: bool = False) -> None:
+        if truncated and not self._chunks:
+            return
+        await self.checkpoint(
+            status=MessageStatus.TRUNCATED if truncated else MessageStatus.COMPLETE
+        )
+
+    async def record(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Pass `chunks` through, persisting them as they go.
+
+        If the source fails or is cancelled, whatever arrived is kept as a
+        truncated message.
+        """
+        try:
+            async for chunk in chunks:
+                await self.append(chunk)
+                yield chunk
+        except BaseException:
+            with anyio.CancelScope(shield=True):
+                await self.finish(truncated=True)
+            raise
+        await self.finish()
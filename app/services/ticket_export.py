@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from sqlalchemy import Row
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "ticket_id",
+    "title",
+    "description",
+    "status",
+    "user_id",
+    "created_at",
+    "message_id",
+    "message_content",
+    "message_is_ai",
+    "message_status",
+    "message_created_at",
+]
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _str(value) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+async def to_ndjson(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    """One JSON object per ticket, with its messages nested, per line.
+
+    Rows arrive grouped by ticket, so only the ticket being assembled is
+    held in memory; each batch of rows is sent as one chunk.
+    """
+    ticket: Optional[Dict[str, Any]] = None
+    async for rows in batches:
+        lines = []
+        for row in rows:
+            if ticket is None or ticket["id"] != str(row.id):
+                if ticket is not None:
+                    lines.append(json.dumps(ticket))
+                ticket = {
+                    "id": str(row.id),
+                    "title": row.title,
+                    "description": row.description,
+                    "status": row.status,
+                    "user_id": _str(row.user_id),
+                    "created_at": _iso(row.created_at),
+                    "messages": [],
+                }
+            if row.message_id is not None:
+                ticket["messages"].append(
+                    {
+                        "id": str(row.message_id),
+                        "content": row.message_content,
+                        "is_ai": row.message_is_ai,
+                        "status": row.message_status,
+                        "created_at": _iso(row.message_created_at),
+                    }
+                )
+        if lines:
+            yield "\n".join(lines) + "\n"
+    if ticket is not None:
+        yield json.dumps(ticket) + "\n"
+
+
+async def to_csv(batches: AsyncIterator[Sequence[Row]]) -> AsyncIterator[str]:
+    """One CSV row per message; tickets without messages get one row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    async for rows in batches:
+        for row in rows:
+            writer.writerow(
+                [
+                    row.id,
+                    row.title,
+                    row.description,
+                    row.status,
+                    row.user_id,
+                    _iso(row.created_at),
+                    row.message_id,
+                    row.message_content,
+                    row.message_is_ai,
+                    row.message_status,
+                    _iso(row.message_created_at),
+                ]
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
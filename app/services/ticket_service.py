@@ -1,73 +1,299 @@
-from typing import List
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, NoReturn, Optional, Tuple
 from uuid import UUID
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.schemas.ticket import (
+    BulkItemResult,
+    MessageBulkCreate,
     MessageCreate,
     Ticket,
+    TicketBulkUpdate,
     TicketCreate,
+    TicketSearchResult,
+    TicketStats,
     TicketUpdate,
     TicketWithMessages,
 )
-from app.core.exceptions import NotAuthorizedForTicketException, TicketNotFoundException
-from app.db.models import User
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.exceptions import (
+    NotAuthorizedForTicketException,
+    TicketNotFoundException,
+    UserNotFoundException,
+)
+from app.core.user_cache import UserPrincipal
 from app.db.repositories.ticket_repository import TicketRepository
+from app.db.repositories.ticket_stats_repository import FIRST_RESPONSE_BUCKETS
+from app.db.repositories.user_repository import UserRepository
+from app.services.ticket_export import to_csv, to_ndjson
+
+# (upper bound in days, label) for the ages of open tickets.
+OPEN_AGE_BUCKETS = ((1, "under_1d"), (7, "1d_to_7d"), (30, "7d_to_30d"), (None, "over_30d"))
+
+
+def _estimate_median(histogram: Dict[int, int]) -> Optional[float]:
+    # Interpolates linearly inside the bucket holding the middle value; the
+    # open-ended last bucket reports its lower bound.
+    total = sum(histogram.values())
+    if not total:
+        return None
+    seen = 0
+    for bucket in sorted(histogram):
+        count = histogram[bucket]
+        lower = FIRST_RESPONSE_BUCKETS[bucket - 1] if bucket > 0 else 0
+        if seen + count >= total / 2:
+            if bucket >= len(FIRST_RESPONSE_BUCKETS):
+                return float(lower)
+            upper = FIRST_RESPONSE_BUCKETS[bucket]
+            return lower + (total / 2 - seen) / count * (upper - lower)
+        seen += count
+    return None
+
+
+def ticket_with_messages(ticket: Row, messages: List[Row]) -> TicketWithMessages:
+    # Built without validation from rows of TICKET_COLUMNS and
+    # MESSAGE_COLUMNS, whose values come straight from typed columns. The
+    # messages stay rows: they read like Message objects and ORJSONResponse
+    # renders them directly, several times faster than building models.
+    return TicketWithMessages.model_construct(**ticket._mapping, messages=messages)
 
 
 class TicketService:
     def __init__(self, db: AsyncSession):
         self.ticket_repository = TicketRepository(db)
+        self.user_repository = UserRepository(db)
 
-    async def create_ticket(self, user: User, ticket_in: TicketCreate) -> Ticket:
-        ticket_data = ticket_in.model_dump()
+    async def create_ticket(self, user: UserPrincipal, ticket_in: TicketCreate) -> Ticket:
         ticket = await self.ticket_repository.create(
-            obj_in=TicketCreate(**{**ticket_data, "user_id": user.id})
+            obj_in={**ticket_in.model_dump(), "user_id": user.id}
         )
         return ticket
 
-    async def get_user_tickets(self, user: User) -> List[Ticket]:
-        return await self.ticket_repository.get_user_tickets(user_id=user.id)
+    async def get_user_tickets(
+        self,
+        user: UserPrincipal,
+        *,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Row], Optional[str]]:
+        return await self.ticket_repository.get_user_tickets(
+            user_id=user.id,
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            cursor=cursor,
+            limit=limit,
+        )
 
-    async def get_ticket_with_messages(
-        self, user: User, ticket_id: UUID
-    ) -> TicketWithMessages:
-        ticket = await self.ticket_repository.get_by_id_with_messages(ticket_id=ticket_id)
+    async def search_tickets(
+        self,
+        user: UserPrincipal,
+        query: str,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+    ) -> Tuple[List[TicketSearchResult], Optional[str]]:
+        rows, next_cursor = await self.ticket_repository.search(
+            query, self._owner_scope(user), cursor=cursor, limit=limit
+        )
+        results = [
+            TicketSearchResult(
+                ticket=Ticket.model_validate(ticket),
+                rank=rank,
+                snippet=snippet,
+                message_id=message_id,
+            )
+            for ticket, rank, message_id, snippet in rows
+        ]
+        return results, next_cursor
+
+    def export_tickets(
+        self,
+        user: UserPrincipal,
+        export_format: str,
+        *,
+        user_id: Optional[UUID] = None,
+        status: Optional[str] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+    ) -> AsyncIterator[str]:
+        batches = self.ticket_repository.stream_with_messages(
+            self._owner_scope(user),
+            user_id=user_id,
+            status=status,
+            created_after=created_after,
+            created_before=created_before,
+            batch_size=settings.EXPORT_BATCH_SIZE,
+        )
+        return to_csv(batches) if export_format == "csv" else to_ndjson(batches)
+
+    async def get_stats(
+        self, user: UserPrincipal, user_id: Optional[UUID] = None
+    ) -> TicketStats:
+        owner_id = self._owner_scope(user)
+        statuses, (ai_messages, human_messages), first_responses = (
+            await self.ticket_repository.stats.get_stats(owner_id or user_id)
+        )
+
+        today = datetime.now(timezone.utc).date()
+        by_status: Dict[str, int] = {}
+        open_by_age = {label: 0 for _, label in OPEN_AGE_BUCKETS}
+        for status, created_on, count in statuses:
+            by_status[status] = by_status.get(status, 0) + count
+            if status == "open":
+                age = (today - created_on).days
+                label = next(
+                    label for bound, label in OPEN_AGE_BUCKETS if bound is None or age < bound
+                )
+                open_by_age[label] += count
+
+        total_messages = ai_messages + human_messages
+        return TicketStats(
+            by_status=by_status,
+            open_by_age=open_by_age,
+            ai_messages=ai_messages,
+            human_messages=human_messages,
+            ai_message_ratio=ai_messages / total_messages if total_messages else None,
+            first_responses=sum(first_responses.values()),
+            median_first_response_seconds=_estimate_median(first_responses),
+        )
+
+    async def get_ticket(self, user: UserPrincipal, ticket_id: UUID) -> Ticket:
+        ticket = await self.ticket_repository.get_by_id_owned(
+            ticket_id, self._owner_scope(user)
+        )
         if not ticket:
-            raise TicketNotFoundException()
-        
-        # Check if user is authorized to access this ticket
-        if str(ticket.user_id) != str(user.id) and user.role != "admin":
-            raise NotAuthorizedForTicketException()
-        
+            await self._raise_not_found_or_forbidden(ticket_id)
         return ticket
 
+    async def get_ticket_with_messages(
+        self, user: UserPrincipal, ticket_id: UUID, message_limit: int
+    ) -> Tuple[TicketWithMessages, Optional[str]]:
+        ticket, messages, next_cursor = (
+            await self.ticket_repository.get_by_id_with_recent_messages(
+                ticket_id=ticket_id,
+                owner_id=self._owner_scope(user),
+                message_limit=message_limit,
+            )
+        )
+        if not ticket:
+            await self._raise_not_found_or_forbidden(ticket_id)
+        return ticket_with_messages(ticket, messages), next_cursor
+
+    async def get_ticket_etag(
+        self, user: UserPrincipal, ticket_id: UUID, *variant: Any
+    ) -> Optional[str]:
+        """ETag for a view of the ticket, or None if it is not visible.
+
+        `variant` holds whatever else selects what the view shows (page
+        size, cursor) so different views never share a tag.
+        """
+        version = await self.ticket_repository.get_version(
+            ticket_id, self._owner_scope(user)
+        )
+        if version is None:
+            return None
+        return make_etag(ticket_id, version.updated_at, version.newest_message_id, *variant)
+
+    async def get_messages(
+        self,
+        user: UserPrincipal,
+        ticket_id: UUID,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Tuple[List[Row], Optional[str]]:
+        owner_id = self._owner_scope(user)
+        messages, next_cursor = await self.ticket_repository.get_messages(
+            ticket_id, owner_id, cursor=cursor, limit=limit
+        )
+        # An empty page is ambiguous: no (more) messages, or no access.
+        if not messages and not await self.ticket_repository.get_by_id_owned(
+            ticket_id, owner_id
+        ):
+            await self._raise_not_found_or_forbidden(ticket_id)
+        return messages, next_cursor
+
     async def update_ticket(
-        self, user: User, ticket_id: UUID, ticket_update: TicketUpdate
+        self, user: UserPrincipal, ticket_id: UUID, ticket_update: TicketUpdate
     ) -> Ticket:
-        ticket = await self.ticket_repository.get_by_id(id=ticket_id)
-        if not ticket:
-            raise TicketNotFoundException()
-        
-        # Check if user is authorized to update this ticket
-        if str(ticket.user_id) != str(user.id) and user.role != "admin":
-            raise NotAuthorizedForTicketException()
-        
-        updated_ticket = await self.ticket_repository.update(
-            db_obj=ticket, obj_in=ticket_update.model_dump(exclude_unset=True)
+        ticket = await self.ticket_repository.update_owned(
+            ticket_id=ticket_id,
+            owner_id=self._owner_scope(user),
+            obj_in=ticket_update.model_dump(exclude_unset=True),
         )
-        return updated_ticket
+        if not ticket:
+            await self._raise_not_found_or_forbidden(ticket_id)
+        return ticket
 
     async def add_message(
-        self, user: User, ticket_id: UUID, message_in: MessageCreate
+        self, user: UserPrincipal, ticket_id: UUID, message_in: MessageCreate
     ):
-        ticket = await self.ticket_repository.get_by_id(id=ticket_id)
-        if not ticket:
-            raise TicketNotFoundException()
-        
-        # Check if user is authorized to add message to this ticket
-        if str(ticket.user_id) != str(user.id) and user.role != "admin":
-            raise NotAuthorizedForTicketException()
-        
-        message = await self.ticket_repository.add_message(
-            ticket_id=ticket_id, message_in=message_in
+        message = await self.ticket_repository.add_message_owned(
+            ticket_id=ticket_id,
+            owner_id=self._owner_scope(user),
+            message_in=message_in,
+        )
+        if not message:
+            await self._raise_not_found_or_forbidden(ticket_id)
+        return message
+
+    async def bulk_update_tickets(self, bulk: TicketBulkUpdate) -> List[BulkItemResult]:
+        if bulk.user_id is not None and not await self.user_repository.get_by_id(
+            bulk.user_id
+        ):
+            raise UserNotFoundException()
+
+        ticket_ids = list(dict.fromkeys(bulk.ticket_ids))
+        updated = set(
+            await self.ticket_repository.bulk_update(
+                ticket_ids, bulk.model_dump(include={"status", "user_id"}, exclude_none=True)
+            )
         )
-        return message
\ No newline at end of file
+        return [
+            BulkItemResult(ticket_id=ticket_id, ok=True)
+            if ticket_id in updated
+            else BulkItemResult(ticket_id=ticket_id, ok=False, error="Ticket not found")
+            for ticket_id in ticket_ids
+        ]
+
+    async def bulk_add_messages(self, bulk: MessageBulkCreate) -> List[BulkItemResult]:
+        existing = set(
+            await self.ticket_repository.get_existing_ids(
+                list({message.ticket_id for message in bulk.messages})
+            )
+        )
+        rows, results = [], []
+        for message in bulk.messages:
+            if message.ticket_id not in existing:
+                results.append(
+                    BulkItemResult(
+                        ticket_id=message.ticket_id, ok=False, error="Ticket not found"
+                    )
+                )
+                continue
+            row = {**message.model_dump(), "id": uuid.uuid4()}
+            rows.append(row)
+            results.append(
+                BulkItemResult(ticket_id=message.ticket_id, ok=True, message_id=row["id"])
+            )
+        if rows:
+            await self.ticket_repository.bulk_add_messages(rows)
+        return results
+
+    @staticmethod
+    def _owner_scope(user: UserPrincipal) -> Optional[UUID]:
+        # Admins may act on any ticket; everyone else only on their own.
+        return None if user.role == "admin" else user.id
+
+    async def _raise_not_found_or_forbidden(self, ticket_id: UUID) -> NoReturn:
+        # Only reached when the authorized statement matched nothing, so the
+        # happy path stays a single round-trip.
+        if await self.ticket_repository.exists(ticket_id):
+            raise NotAuthorizedForTicketException()
+        raise TicketNotFoundException()
\ No newline at end of file
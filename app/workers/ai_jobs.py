@@ -0,0 +1,245 @@
+"""Worker for queued AI replies.
+
+Runs inside the API process (see AI_JOB_INPROCESS_WORKERS) or on its own:
+
+    python -m app.workers.ai_jobs
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Callable, List, Optional
+from uuid import UUID
+
+import aiohttp
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import (
+    GenerationQueueFullException,
+    GenerationQueueTimeoutException,
+    GenerationRateLimitedException,
+)
+from app.core.webhooks import (
+    SIGNATURE_HEADER,
+    PublicOnlyResolver,
+    WebhookTargetError,
+    check_delivery_target,
+    sign,
+)
+from app.db.base import SessionLocal
+from app.db.models import AIJob, AIJobStatus
+from app.db.repositories.ai_job_repository import AIJobRepository
+from app.db.repositories.ticket_repository import TicketRepository
+from app.services.ai_service import AIService, build_reply_prompt
+from app.services.generation_scheduler import GenerationScheduler, GenerationSlot
+from app.services.stream_recorder import StreamRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class AIJobWorker:
+    """Claims jobs from the `ai_job` table and generates their replies.
+
+    Every worker, in any process, polls the same table; claiming uses
+    SELECT ... FOR UPDATE SKIP LOCKED, so no job is run twice and no broker
+    is needed. A claimed job is leased for `lease_seconds`; if its worker
+    dies, the job becomes claimable again once the lease lapses.
+    """
+
+    def __init__(
+        self,
+        ai_service: AIService,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        concurrency: int = settings.AI_JOB_WORKER_CONCURRENCY,
+        poll_interval: float = settings.AI_JOB_POLL_SECONDS,
+        lease_seconds: float = settings.AI_JOB_LEASE_SECONDS,
+        max_attempts: int = settings.AI_JOB_MAX_ATTEMPTS,
+    ):
+        self.ai_service = ai_service
+        self.session_factory = session_factory
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._tasks: List[asyncio.Task] = []
+        self._http: Optional[aiohttp.ClientSession] = None
+
+    def start(self) -> None:
+        self._http = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(resolver=PublicOnlyResolver()),
+            timeout=aiohttp.ClientTimeout(total=settings.AI_JOB_WEBHOOK_TIMEOUT_SECONDS),
+        )
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        # Jobs interrupted here are picked up again when their lease lapses.
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._http is not None:
+            await self._http.close()
+            self._http = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                job = await self._claim()
+            except Exception:
+                logger.exception("Failed to claim an AI job")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            # One job's failure (say, the database going away while its
+            # result is saved) must not stop this worker for good; an
+            # unfinished job is claimed again once its lease lapses.
+            try:
+                await self.process(job)
+            except Exception:
+                logger.exception("Failed to process AI job %s", job.id)
+
+    async def _claim(self) -> Optional[AIJob]:
+        async with self.session_factory() as session, session.begin():
+            return await AIJobRepository(session).claim_next(self.lease_seconds)
+
+    async def process(self, job: AIJob) -> Optional[AIJob]:
+        # A retried job continues in the message its last attempt left.
+        recorder = StreamRecorder(
+            self.session_factory, job.ticket_id, message_id=job.result_message_id
+        )
+        try:
+            message_id = await self._generate(job, recorder)
+        except Exception as exc:
+            logger.exception("AI job %s failed", job.id)
+            async with self.session_factory() as session, session.begin():
+                job = await AIJobRepository(session).mark_failed(
+                    job.id,
+                    str(exc) or type(exc).__name__,
+                    self.max_attempts,
+                    partial_message_id=recorder.message_id,
+                )
+        else:
+            async with self.session_factory() as session, session.begin():
+                job = await AIJobRepository(session).mark_succeeded(job.id, message_id)
+
+        if job is None:
+            # Deleted meanwhile, with its ticket; there is nothing to report.
+            return None
+        if job.webhook_url and job.status in (AIJobStatus.SUCCEEDED, AIJobStatus.FAILED):
+            await self._deliver_webhook(job)
+        return job
+
+    async def _acquire_slot(self, job: AIJob) -> Optional[GenerationSlot]:
+        # Jobs go through the same admission control as streamed replies.
+        # A rejection is waited out rather than failing the job, for at most
+        # half the lease so the job is not claimed again meanwhile.
+        scheduler = self.ai_service.scheduler
+        if scheduler is None:
+            return None
+        deadline = time.monotonic() + self.lease_seconds / 2
+        while True:
+            try:
+                return await scheduler.acquire(job.user_id or job.ticket_id)
+            except (
+                GenerationRateLimitedException,
+                GenerationQueueFullException,
+                GenerationQueueTimeoutException,
+            ) as exc:
+                delay = float(exc.headers.get("Retry-After", 1))
+                if time.monotonic() + delay > deadline:
+                    raise
+                await asyncio.sleep(delay)
+
+    async def _generate(self, job: AIJob, recorder: StreamRecorder) -> UUID:
+        async with self.session_factory() as session:
+            ticket, messages, _ = await TicketRepository(
+                session
+            ).get_by_id_with_recent_messages(
+                ticket_id=job.ticket_id,
+                owner_id=None,
+                message_limit=settings.AI_HISTORY_MESSAGE_LIMIT,
+            )
+        if ticket is None:
+            raise LookupError("Ticket no longer exists")
+        # The earlier attempt's partial reply is about to be rewritten.
+        prompt = build_reply_prompt(
+            [message for message in messages if message.id != recorder.message_id]
+        )
+        if prompt is None:
+            raise LookupError("No customer messages to respond to")
+
+        slot = await self._acquire_slot(job)
+        try:
+            chunks = self.ai_service.generate_response_stream(
+                ticket_description=ticket.description,
+                message_history=prompt.message_history,
+                latest_message=prompt.latest_message,
+                ticket_id=job.ticket_id,
+                owner_id=ticket.user_id,
+            )
+            if slot is not None:
+                chunks = slot.hold(chunks)
+            async for _ in recorder.record(chunks):
+                pass
+        finally:
+            if slot is not None:
+                slot.release()
+        return recorder.message_id
+
+    async def _deliver_webhook(self, job: AIJob) -> None:
+        try:
+            check_delivery_target(job.webhook_url)
+        except WebhookTargetError:
+            logger.warning("Refusing webhook for AI job %s: target not allowed", job.id)
+            return
+        body = json.dumps(
+            {
+                "job_id": str(job.id),
+                "ticket_id": str(job.ticket_id),
+                "status": job.status,
+                "result_message_id": (
+                    str(job.result_message_id) if job.result_message_id else None
+                ),
+                "error": job.error,
+            }
+        ).encode()
+        for attempt in range(settings.AI_JOB_WEBHOOK_RETRIES + 1):
+            # Signed per attempt, so the timestamp is fresh on retries.
+            headers = {
+                "Content-Type": "application/json",
+                "X-Webhook-Id": str(job.id),
+                SIGNATURE_HEADER: sign(body),
+            }
+            try:
+                async with self._http.post(
+                    job.webhook_url, data=body, headers=headers, allow_redirects=False
+                ) as response:
+                    # Client errors will not go away on a retry.
+                    if response.status < 500:
+                        return
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                pass
+            if attempt < settings.AI_JOB_WEBHOOK_RETRIES:
+                await asyncio.sleep(2 ** attempt)
+        logger.warning("Giving up on webhook for AI job %s", job.id)
+
+
+async def main() -> None:
+    ai_service = AIService(scheduler=GenerationScheduler())
+    worker = AIJobWorker(ai_service)
+    worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await worker.stop()
+        await ai_service.aclose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,74 @@
+"""Marks AI replies orphaned mid-stream as truncated.
+
+StreamRecorder keeps a reply's status at `streaming` until its last
+checkpoint. If the process writing it dies first, nothing else ever moves
+it on, so replies with no checkpoint for AI_STREAM_STALE_SECONDS are marked
+truncated. Runs at startup and then periodically inside the API process
+(see AI_STREAM_SWEEP_SECONDS), or once on its own:
+
+    python -m app.workers.stale_streams
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import SessionLocal, engine
+from app.db.repositories.ticket_repository import TicketRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep(
+    session_factory: Callable[[], AsyncSession] = SessionLocal,
+    stale_seconds: float = settings.AI_STREAM_STALE_SECONDS,
+) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=stale_seconds)
+    async with session_factory() as session, session.begin():
+        count = await TicketRepository(session).truncate_stale_messages(cutoff)
+    if count:
+        logger.warning("Marked %d stale streaming replies as truncated", count)
+    return count
+
+
+class StaleStreamSweeper:
+    def __init__(
+        self,
+        interval: float = settings.AI_STREAM_SWEEP_SECONDS,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+    ):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await sweep(self.session_factory)
+            except Exception:
+                logger.exception("Failed to sweep stale streaming replies")
+            await asyncio.sleep(self.interval)
+
+
+async def main() -> None:
+    try:
+        await sweep()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
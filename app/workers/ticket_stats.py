@@ -0,0 +1,65 @@
+"""Corrects the ticket dashboard counters from the ticket and message tables.
+
+The counters are maintained incrementally by TicketRepository; this only
+corrects drift, such as rows changed outside the application. Runs
+periodically inside the API process (see TICKET_STATS_RECONCILE_SECONDS) or
+once on its own:
+
+    python -m app.workers.ticket_stats
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.base import SessionLocal, engine
+from app.db.repositories.ticket_stats_repository import TicketStatsRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile(session_factory: Callable[[], AsyncSession] = SessionLocal) -> None:
+    async with session_factory() as session, session.begin():
+        await TicketStatsRepository(session).reconcile()
+
+
+class TicketStatsReconciler:
+    def __init__(
+        self,
+        interval: float = settings.TICKET_STATS_RECONCILE_SECONDS,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+    ):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await reconcile(self.session_factory)
+            except Exception:
+                logger.exception("Failed to reconcile ticket stats")
+
+
+async def main() -> None:
+    try:
+        await reconcile()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
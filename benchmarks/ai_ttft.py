@@ -0,0 +1,92 @@
+"""Compare time-to-first-token for a per-request Groq client and the shared one.
+
+    python -m benchmarks.ai_ttft --requests 200 --concurrency 10
+
+Starts the mock LLM in-process and points AIService at it, so no network
+access or API key is needed.
+"""
+import argparse
+import asyncio
+import os
+import time
+from typing import List
+
+from benchmarks.common import Timer, print_summary, summarize
+from benchmarks.mock_llm import start_mock_llm
+
+MOCK_PORT = int(os.environ.get("BENCH_MOCK_LLM_PORT", "9000"))
+os.environ.setdefault("GROQ_BASE_URL", f"http://127.0.0.1:{MOCK_PORT}")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("AI_RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://benchmark@localhost/benchmark")
+
+import groq  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.services.ai_service import AIService  # noqa: E402
+
+PROMPT = {
+    "ticket_description": "My order has not arrived yet.",
+    "message_history": [],
+    "latest_message": "Where is my order?",
+}
+
+
+async def time_to_first_token(ai_service: AIService) -> float:
+    started = time.perf_counter()
+    stream = ai_service.generate_response_stream(**PROMPT)
+    await stream.__anext__()
+    ttft = time.perf_counter() - started
+    async for _ in stream:
+        pass
+    return ttft
+
+
+async def per_request() -> float:
+    # What the endpoint used to do: a fresh client (and connection) per reply.
+    ai_service = AIService(
+        client=groq.AsyncGroq(api_key=settings.GROQ_API_KEY, base_url=settings.GROQ_BASE_URL)
+    )
+    try:
+        return await time_to_first_token(ai_service)
+    finally:
+        await ai_service.aclose()
+
+
+async def run(name: str, call, requests: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one():
+        async with semaphore:
+            latencies.append(await call())
+
+    with Timer() as timer:
+        await asyncio.gather(*(one() for _ in range(requests)))
+    print_summary(name, summarize(latencies, timer.elapsed))
+
+
+async def main(args: argparse.Namespace) -> None:
+    runner = await start_mock_llm(port=MOCK_PORT, latency=args.latency, tokens=args.tokens)
+    shared = AIService()
+    try:
+        await run("ttft per-request client", per_request, args.requests, args.concurrency)
+        await run(
+            "ttft shared client",
+            lambda: time_to_first_token(shared),
+            args.requests,
+            args.concurrency,
+        )
+    finally:
+        await shared.aclose()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=20)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,107 @@
+"""Compare per-ticket updates with the bulk endpoints.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.bulk_updates --tickets 10000
+
+Runs the app in-process as an admin and times closing N tickets through
+PUT /tickets/{id} one by one against a single POST /tickets/bulk/status,
+then the same for adding one message per ticket. Round-trips are counted
+with the same engine hooks as benchmarks.roundtrips. The bulk endpoints
+bind ids as a Postgres array, so this needs PostgreSQL.
+"""
+import argparse
+import asyncio
+import os
+import uuid
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+
+from benchmarks.common import Timer  # noqa: E402
+from benchmarks.roundtrips import RoundTripCounter  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.db.models import Ticket, User  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def seed(count: int):
+    async with SessionLocal() as session:
+        admin = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", role="admin")
+        session.add(admin)
+        await session.flush()
+        tickets = [
+            Ticket(
+                title=f"Bulk benchmark {i}",
+                description="Bulk update benchmark ticket",
+                user_id=admin.id,
+            )
+            for i in range(count)
+        ]
+        session.add_all(tickets)
+        await session.commit()
+        return admin, [str(ticket.id) for ticket in tickets]
+
+
+async def main(args: argparse.Namespace) -> None:
+    admin, ticket_ids = await seed(args.tickets * 2)
+    # Separate halves so each strategy updates tickets in the same state.
+    loop_ids, bulk_ids = ticket_ids[: args.tickets], ticket_ids[args.tickets:]
+    headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+    counter = RoundTripCounter(engine.sync_engine)
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with app.router.lifespan_context(app), httpx.AsyncClient(
+            transport=transport, base_url="http://bench/api/v1", timeout=None
+        ) as client:
+            await client.get("/tickets/", headers=headers)
+
+            with counter.measure(f"PUT x{len(loop_ids)}"), Timer() as timer:
+                for ticket_id in loop_ids:
+                    await client.put(
+                        f"/tickets/{ticket_id}", json={"status": "closed"}, headers=headers
+                    )
+            print(f"{'':<28} elapsed_s={timer.elapsed:.2f}")
+
+            with counter.measure(f"POST bulk/status x{len(bulk_ids)}"), Timer() as timer:
+                response = await client.post(
+                    "/tickets/bulk/status",
+                    json={"ticket_ids": bulk_ids, "status": "closed"},
+                    headers=headers,
+                )
+                response.raise_for_status()
+            print(f"{'':<28} elapsed_s={timer.elapsed:.2f}")
+
+            with counter.measure(f"POST messages x{len(loop_ids)}"), Timer() as timer:
+                for ticket_id in loop_ids:
+                    await client.post(
+                        f"/tickets/{ticket_id}/messages",
+                        json={"content": "Closing this ticket."},
+                        headers=headers,
+                    )
+            print(f"{'':<28} elapsed_s={timer.elapsed:.2f}")
+
+            with counter.measure(f"POST bulk/messages x{len(bulk_ids)}"), Timer() as timer:
+                response = await client.post(
+                    "/tickets/bulk/messages",
+                    json={
+                        "messages": [
+                            {"ticket_id": ticket_id, "content": "Closing this ticket."}
+                            for ticket_id in bulk_ids
+                        ]
+                    },
+                    headers=headers,
+                )
+                response.raise_for_status()
+            print(f"{'':<28} elapsed_s={timer.elapsed:.2f}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickets", type=int, default=10000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""Measure how a burst of logins affects latency of unrelated endpoints.
+
+Run against a live server (BENCH_BASE_URL, default http://localhost:8000):
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+
+The probe repeatedly calls GET /tickets while idle and then during the login
+burst. With hashing on the worker pool the probe p99 should stay roughly flat.
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+import aiohttp
+
+from benchmarks.common import API_URL, Timer, print_summary, summarize
+
+PASSWORD = "benchmark-password"
+
+
+async def create_user(session: aiohttp.ClientSession) -> str:
+    email = f"bench-{uuid.uuid4().hex[:12]}@example.com"
+    async with session.post(
+        f"{API_URL}/auth/signup", json={"email": email, "password": PASSWORD}
+    ) as resp:
+        resp.raise_for_status()
+    return email
+
+
+async def login(session: aiohttp.ClientSession, email: str) -> str:
+    async with session.post(
+        f"{API_URL}/auth/login", data={"username": email, "password": PASSWORD}
+    ) as resp:
+        resp.raise_for_status()
+        return (await resp.json())["access_token"]
+
+
+async def probe(
+    session: aiohttp.ClientSession, token: str, stop: asyncio.Event, interval: float
+) -> List[float]:
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        async with session.get(f"{API_URL}/tickets/", headers=headers) as resp:
+            await resp.read()
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run_probe(session, token, seconds: float, interval: float) -> List[float]:
+    stop = asyncio.Event()
+    task = asyncio.create_task(probe(session, token, stop, interval))
+    await asyncio.sleep(seconds)
+    stop.set()
+    return await task
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with aiohttp.ClientSession() as session:
+        email = await create_user(session)
+        token = await login(session, email)
+
+        with Timer() as idle_timer:
+            idle = await run_probe(session, token, args.idle_seconds, args.interval)
+        print_summary("probe (idle)", summarize(idle, idle_timer.elapsed))
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        login_latencies: List[float] = []
+
+        async def one_login():
+            async with semaphore:
+                started = time.perf_counter()
+                await login(session, email)
+                login_latencies.append(time.perf_counter() - started)
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(session, token, stop, args.interval))
+        with Timer() as storm_timer:
+            await asyncio.gather(*(one_login() for _ in range(args.logins)))
+        stop.set()
+        during = await probe_task
+
+        print_summary("login", summarize(login_latencies, storm_timer.elapsed))
+        print_summary("probe (during storm)", summarize(during, storm_timer.elapsed))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--interval", type=float, default=0.01)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,72 @@
+"""A local Groq/OpenAI-compatible chat completions server for benchmarks.
+
+    python -m benchmarks.mock_llm --port 9000 --latency 0.2 --token-rate 200
+
+Point the app at it with GROQ_BASE_URL=http://localhost:9000.
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from aiohttp import web
+
+
+def create_app(latency: float = 0.0, token_rate: float = 0.0, tokens: int = 50) -> web.Application:
+    """`latency` delays the first token; `token_rate` is tokens/second (0 = unthrottled)."""
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "mock")
+        created = int(time.time())
+
+        def chunk(delta: dict, finish_reason=None) -> bytes:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode()
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await asyncio.sleep(latency)
+        await response.write(chunk({"role": "assistant", "content": ""}))
+        for i in range(tokens):
+            await response.write(chunk({"content": f"token{i} "}))
+            if token_rate:
+                await asyncio.sleep(1 / token_rate)
+        await response.write(chunk({}, finish_reason="stop"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_post("/openai/v1/chat/completions", chat_completions)
+    return app
+
+
+async def start_mock_llm(host: str = "127.0.0.1", port: int = 9000, **options) -> web.AppRunner:
+    runner = web.AppRunner(create_app(**options))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--token-rate", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=50)
+    args = parser.parse_args()
+    web.run_app(
+        create_app(args.latency, args.token_rate, args.tokens),
+        host=args.host,
+        port=args.port,
+    )
@@ -0,0 +1,113 @@
+"""Count database round-trips per ticket endpoint.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.roundtrips
+
+Runs the app in-process and counts statements and transaction commits
+issued on the engine while serving each request. Pass --create-tables to
+run against an empty database. PostgreSQL only: the write paths rely on
+its upserts and data-modifying CTEs, and the schema on its search types.
+"""
+import argparse
+import asyncio
+import os
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import Base, SessionLocal, engine  # noqa: E402
+from app.db.models import User  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+class RoundTripCounter:
+    def __init__(self, sync_engine):
+        self.counts = Counter()
+        event.listen(sync_engine, "before_cursor_execute", self._statement)
+        event.listen(sync_engine, "commit", self._commit)
+
+    def _statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.counts["statements"] += 1
+
+    def _commit(self, conn):
+        self.counts["commits"] += 1
+
+    @contextmanager
+    def measure(self, name: str):
+        self.counts.clear()
+        yield
+        total = self.counts["statements"] + self.counts["commits"]
+        print(
+            f"{name:<28} statements={self.counts['statements']}  "
+            f"commits={self.counts['commits']}  round_trips={total}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    # Disposing the engine on every path lets the process exit on errors
+    # instead of waiting on the driver's pooled connections.
+    try:
+        if args.create_tables:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+
+        async with SessionLocal() as session:
+            user = User(email=f"bench-{uuid.uuid4().hex[:12]}@example.com", role="user")
+            session.add(user)
+            await session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+        counter = RoundTripCounter(engine.sync_engine)
+        await run_requests(counter, headers)
+    finally:
+        await engine.dispose()
+
+
+async def run_requests(counter: RoundTripCounter, headers: dict) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=transport, base_url="http://bench/api/v1"
+    ) as client:
+        # Warm the authenticated user cache so every endpoint is measured alike.
+        await client.get("/tickets/", headers=headers)
+
+        with counter.measure("POST /tickets"):
+            ticket = (
+                await client.post(
+                    "/tickets/",
+                    json={"title": "Benchmark", "description": "Round-trip benchmark"},
+                    headers=headers,
+                )
+            ).json()
+        with counter.measure("PUT /tickets/{id}"):
+            await client.put(
+                f"/tickets/{ticket['id']}", json={"status": "closed"}, headers=headers
+            )
+        with counter.measure("POST /tickets/{id}/messages"):
+            await client.post(
+                f"/tickets/{ticket['id']}/messages",
+                json={"content": "Hello"},
+                headers=headers,
+            )
+        with counter.measure("GET /tickets/{id}"):
+            await client.get(f"/tickets/{ticket['id']}", headers=headers)
+        with counter.measure("GET /tickets"):
+            await client.get("/tickets/", headers=headers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--create-tables", action="store_true")
+    args = parser.parse_args()
+    if engine.dialect.name != "postgresql":
+        raise SystemExit(
+            f"{engine.dialect.name} is not supported; "
+            "set DATABASE_URL=postgresql+asyncpg://..."
+        )
+    asyncio.run(main(args))
@@ -0,0 +1,178 @@
+"""Time GET /tickets/search queries over a synthetic dataset.
+
+    python -m benchmarks.search --seed --tickets 50000 --messages 1000000
+    python -m benchmarks.search --queries 200
+
+Needs PostgreSQL (DATABASE_URL) with migrations applied. `--seed` generates
+the dataset server-side with generate_series, so seeding 1M messages takes
+seconds rather than a million round-trips. Queries run through
+TicketRepository.search, both unscoped (admin) and scoped to one user, and
+`--explain` prints the plan of one query to check the GIN indexes are used.
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from sqlalchemy import select, text
+
+from benchmarks.common import Timer, print_summary, summarize
+
+from app.db.base import SessionLocal, engine
+from app.db.models import Ticket
+from app.db.repositories.ticket_repository import TicketRepository
+
+# Frequent words match many rows, rare ones few; queries mix both.
+COMMON_WORDS = ["order", "account", "help", "issue", "please", "thanks", "update", "email"]
+RARE_WORDS = ["refund", "chargeback", "invoice", "password", "shipping", "warranty", "coupon", "login"]
+FILLER_WORDS = ["the", "my", "is", "not", "and", "was", "with", "for", "it", "again", "still", "today"]
+QUERIES = [
+    "refund",
+    "password reset",
+    '"shipping delay"',
+    "invoice -coupon",
+    "order or account",
+    "warranty claim",
+]
+
+WORDS = """(
+    SELECT CAST(:common AS text[]) AS common,
+           CAST(:rare AS text[]) AS rare,
+           CAST(:filler AS text[]) AS filler
+) AS w"""
+
+# Builds a sentence of `length` words; `rare` and `common` are the chances
+# of each word coming from those lists.
+SENTENCE = """(
+    SELECT string_agg(
+        CASE WHEN r < {rare} THEN w.rare[1 + floor(random() * array_length(w.rare, 1))::int]
+             WHEN r < {common} THEN w.common[1 + floor(random() * array_length(w.common, 1))::int]
+             ELSE w.filler[1 + floor(random() * array_length(w.filler, 1))::int] END,
+        ' ')
+    FROM (SELECT random() AS r FROM generate_series(1, {length})) AS words
+)"""
+
+SEED_USERS = """
+INSERT INTO "user" (id, email, hashed_password, role, created_at, updated_at)
+SELECT gen_random_uuid(), 'bench-' || n || '-' || gen_random_uuid() || '@example.com',
+       'x', 'user', now(), now()
+FROM generate_series(1, :users) AS n
+"""
+
+SEED_TICKETS = f"""
+WITH users AS (
+    SELECT id, row_number() OVER () - 1 AS rn FROM "user" WHERE email LIKE 'bench-%'
+)
+INSERT INTO ticket (id, title, description, status, user_id, created_at, updated_at)
+SELECT gen_random_uuid(),
+       initcap(w.rare[1 + n % array_length(w.rare, 1)]) || ' '
+           || w.common[1 + n % array_length(w.common, 1)],
+       {SENTENCE.format(rare=0.1, common=0.4, length="20 + n % 3")},
+       CASE WHEN n % 3 = 0 THEN 'closed' ELSE 'open' END,
+       users.id,
+       now() - make_interval(secs => n),
+       now()
+FROM generate_series(1, :tickets) AS n
+JOIN users ON users.rn = n % (SELECT count(*) FROM users)
+CROSS JOIN {WORDS}
+"""
+
+SEED_MESSAGES = f"""
+WITH tickets AS (
+    SELECT id, created_at, row_number() OVER () - 1 AS rn FROM ticket
+)
+INSERT INTO message (id, content, is_ai, status, ticket_id, created_at, updated_at)
+SELECT gen_random_uuid(),
+       {SENTENCE.format(rare=0.05, common=0.3, length="10 + n % 30")},
+       n % 2 = 0,
+       'complete',
+       tickets.id,
+       tickets.created_at + make_interval(secs => n % 100000),
+       now()
+FROM generate_series(1, :messages) AS n
+JOIN tickets ON tickets.rn = n % (SELECT count(*) FROM tickets)
+CROSS JOIN {WORDS}
+"""
+
+
+async def seed(args: argparse.Namespace) -> None:
+    params = {
+        "common": COMMON_WORDS,
+        "rare": RARE_WORDS,
+        "filler": FILLER_WORDS,
+        "users": args.users,
+        "tickets": args.tickets,
+        "messages": args.messages,
+    }
+    async with engine.begin() as conn:
+        for name, statement in (
+            ("users", SEED_USERS),
+            ("tickets", SEED_TICKETS),
+            ("messages", SEED_MESSAGES),
+        ):
+            with Timer() as timer:
+                await conn.execute(text(statement), params)
+            print(f"seeded {name:<10} in {timer.elapsed:.1f}s")
+        await conn.execute(text("ANALYZE ticket"))
+        await conn.execute(text("ANALYZE message"))
+
+
+async def run_queries(name: str, owner_ids: List, args: argparse.Namespace) -> None:
+    latencies: List[float] = []
+    with Timer() as timer:
+        for i in range(args.queries):
+            query = QUERIES[i % len(QUERIES)]
+            owner_id = random.choice(owner_ids)
+            async with SessionLocal() as session:
+                repository = TicketRepository(session)
+                started = time.perf_counter()
+                _, cursor = await repository.search(query, owner_id, limit=args.limit)
+                if args.pages > 1 and cursor:
+                    for _ in range(args.pages - 1):
+                        _, cursor = await repository.search(
+                            query, owner_id, cursor=cursor, limit=args.limit
+                        )
+                        if cursor is None:
+                            break
+                latencies.append(time.perf_counter() - started)
+    print_summary(name, summarize(latencies, timer.elapsed))
+
+
+async def explain(query: str) -> None:
+    stmt = TicketRepository._search_statement(query, None, cursor=None, limit=20)
+    compiled = stmt.compile(engine.sync_engine)
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    async with engine.connect() as conn:
+        plan = await conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}", params)
+        for (line,) in plan:
+            print(line)
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        if args.seed:
+            await seed(args)
+        async with SessionLocal() as session:
+            user_ids = (
+                await session.scalars(select(Ticket.user_id).distinct().limit(100))
+            ).all()
+        await run_queries("search admin (unscoped)", [None], args)
+        await run_queries("search scoped to user", user_ids, args)
+        if args.explain:
+            await explain(QUERIES[0])
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="store_true")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--tickets", type=int, default=50000)
+    parser.add_argument("--messages", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=120)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=1)
+    parser.add_argument("--explain", action="store_true")
+    asyncio.run(main(parser.parse_args()))
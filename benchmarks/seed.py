@@ -0,0 +1,188 @@
+"""Seed a database with synthetic users, tickets and messages for the benchmark suite.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.seed --users 200 \\
+        --tickets-per-user 10 --messages-per-ticket 10 --large-conversation 5000
+
+Needs a migrated database. Every user gets the password PASSWORD, hashed
+once. Conversations alternate customer and AI messages and end on a
+customer message, so every ticket is ready for an AI reply. One extra
+ticket gets `--large-conversation` messages, for the ticket detail scenario.
+Rows go in as batched multi-row INSERTs. `--seed-value` fixes the random
+choices, so the same arguments give the same dataset.
+
+The ids the scenarios need are written to a manifest (`--manifest`) that
+benchmarks.suite reads.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from sqlalchemy import insert  # noqa: E402
+
+from benchmarks.common import Timer  # noqa: E402
+
+from app.core.security import get_password_hash  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.db.models import Message, Ticket, User  # noqa: E402
+from app.db.repositories.ticket_stats_repository import TicketStatsRepository  # noqa: E402
+
+PASSWORD = "benchmark-password"
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(__file__), ".seed.json")
+
+CUSTOMER_LINES = [
+    "My order has not arrived yet, can you check where it is?",
+    "I was charged twice for the same invoice.",
+    "The password reset email never shows up.",
+    "Can I change the shipping address on my order?",
+    "The app logs me out every few minutes.",
+]
+AI_LINES = [
+    "Thanks for reaching out. I have checked your account and can see the issue.",
+    "I'm sorry about the trouble. Could you confirm the email on your account?",
+    "I have escalated this to our billing team; you will hear back within a day.",
+    "Please try again now, the change has been applied on our side.",
+]
+
+
+async def insert_batches(table, rows: List[Dict[str, Any]], batch_size: int) -> None:
+    async with engine.begin() as conn:
+        for start in range(0, len(rows), batch_size):
+            await conn.execute(insert(table), rows[start : start + batch_size])
+
+
+def conversation(
+    rng: random.Random, ticket_id: uuid.UUID, opened: datetime, count: int
+) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(count):
+        # Counted back from the end so the last message is the customer's.
+        is_ai = (count - 1 - i) % 2 == 1
+        created_at = opened + timedelta(minutes=5 * (i + 1))
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                "content": rng.choice(AI_LINES if is_ai else CUSTOMER_LINES),
+                "is_ai": is_ai,
+                "status": "complete",
+                "ticket_id": ticket_id,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+        )
+    return rows
+
+
+async def seed(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed_value)
+    now = datetime.now(timezone.utc)
+    run = uuid.uuid4().hex[:8]
+    hashed_password = get_password_hash(PASSWORD)
+
+    users = [
+        {
+            "id": uuid.uuid4(),
+            "email": f"bench-{run}-{i}@example.com",
+            "hashed_password": hashed_password,
+            "role": "user",
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(args.users)
+    ]
+    tickets, messages = [], []
+    for user in users:
+        for i in range(args.tickets_per_user):
+            opened = now - timedelta(minutes=rng.randint(60, 60 * 24 * 60))
+            ticket_id = uuid.uuid4()
+            tickets.append(
+                {
+                    "id": ticket_id,
+                    "title": f"Benchmark ticket {i}",
+                    "description": rng.choice(CUSTOMER_LINES),
+                    "status": "open" if rng.random() < 0.6 else "closed",
+                    "user_id": user["id"],
+                    "created_at": opened,
+                    "updated_at": opened,
+                }
+            )
+            messages.extend(
+                conversation(rng, ticket_id, opened, args.messages_per_ticket)
+            )
+
+    large_ticket_id = uuid.uuid4()
+    opened = now - timedelta(days=30)
+    tickets.append(
+        {
+            "id": large_ticket_id,
+            "title": "Benchmark long conversation",
+            "description": "A ticket with a very long back-and-forth.",
+            "status": "open",
+            "user_id": users[0]["id"],
+            "created_at": opened,
+            "updated_at": opened,
+        }
+    )
+    messages.extend(conversation(rng, large_ticket_id, opened, args.large_conversation))
+
+    for name, table, rows in (
+        ("users", User.__table__, users),
+        ("tickets", Ticket.__table__, tickets),
+        ("messages", Message.__table__, messages),
+    ):
+        with Timer() as timer:
+            await insert_batches(table, rows, args.batch_size)
+        print(f"seeded {len(rows):>8} {name:<10} in {timer.elapsed:.1f}s")
+
+    # The rows bypassed TicketRepository, so rebuild the dashboard counters.
+    if engine.dialect.name == "postgresql":
+        async with SessionLocal() as session, session.begin():
+            await TicketStatsRepository(session).reconcile()
+
+    return {
+        "run": run,
+        "seed_value": args.seed_value,
+        "password": PASSWORD,
+        "users": [{"id": str(user["id"]), "email": user["email"]} for user in users],
+        "tickets": [
+            {"id": str(ticket["id"]), "user_id": str(ticket["user_id"])}
+            for ticket in tickets
+            if ticket["id"] != large_ticket_id
+        ],
+        "large_ticket": {"id": str(large_ticket_id), "user_id": str(users[0]["id"])},
+        "counts": {
+            "users": len(users),
+            "tickets": len(tickets),
+            "messages": len(messages),
+            "large_conversation": args.large_conversation,
+        },
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    try:
+        manifest = await seed(args)
+    finally:
+        await engine.dispose()
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"wrote {args.manifest}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--tickets-per-user", type=int, default=10)
+    parser.add_argument("--messages-per-ticket", type=int, default=10)
+    parser.add_argument("--large-conversation", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed-value", type=int, default=1)
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    asyncio.run(main(parser.parse_args()))
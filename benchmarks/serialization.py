@@ -0,0 +1,152 @@
+"""Compare loading and serializing a long conversation, old path and new.
+
+    DATABASE_URL=postgresql+asyncpg://... python -m benchmarks.serialization \\
+        --messages 10000 --rounds 10
+
+Seeds one ticket with `--messages` messages and reads all of them both
+ways. The old path is what GET /tickets/{id} used to do: load Ticket and
+Message entities, then let FastAPI validate them against
+`response_model=TicketWithMessages` through `from_attributes` and encode the
+result for JSONResponse. The new path is what it does now: select the
+columns as rows and render them with ORJSONResponse. Both must produce the
+same JSON.
+"""
+import argparse
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_model_field  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+from sqlalchemy.orm.attributes import set_committed_value  # noqa: E402
+
+from benchmarks.common import Timer  # noqa: E402
+
+from app.api.schemas.ticket import TicketWithMessages  # noqa: E402
+from app.core.responses import ORJSONResponse  # noqa: E402
+from app.db.base import SessionLocal, engine  # noqa: E402
+from app.db.models import Message, Ticket, User  # noqa: E402
+from app.db.repositories.ticket_repository import TicketRepository  # noqa: E402
+from app.services.ticket_service import ticket_with_messages  # noqa: E402
+
+
+async def seed(count: int) -> uuid.UUID:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    user_id, ticket_id = uuid.uuid4(), uuid.uuid4()
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(User.__table__),
+            [
+                {
+                    "id": user_id,
+                    "email": f"bench-{user_id.hex[:12]}@example.com",
+                    "role": "user",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            ],
+        )
+        await conn.execute(
+            insert(Ticket.__table__),
+            [
+                {
+                    "id": ticket_id,
+                    "title": "Serialization benchmark",
+                    "description": "A ticket with a very long back-and-forth.",
+                    "status": "open",
+                    "user_id": user_id,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            ],
+        )
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "content": f"Message {i}: my order has not arrived yet, can you check?",
+                "is_ai": i % 2 == 1,
+                "status": "complete",
+                "ticket_id": ticket_id,
+                "created_at": now + timedelta(seconds=i),
+                "updated_at": now + timedelta(seconds=i),
+            }
+            for i in range(count)
+        ]
+        for start in range(0, count, 1000):
+            await conn.execute(insert(Message.__table__), rows[start : start + 1000])
+    return ticket_id
+
+
+async def entities(ticket_id: uuid.UUID) -> Ticket:
+    async with SessionLocal() as session:
+        ticket = await session.get(Ticket, ticket_id)
+        messages = (
+            await session.scalars(
+                select(Message)
+                .where(Message.ticket_id == ticket_id)
+                .order_by(Message.created_at, Message.id)
+            )
+        ).all()
+        set_committed_value(ticket, "messages", messages)
+        return ticket
+
+
+async def rows(ticket_id: uuid.UUID, count: int) -> TicketWithMessages:
+    async with SessionLocal() as session:
+        ticket, messages, _ = await TicketRepository(session).get_by_id_with_recent_messages(
+            ticket_id, None, message_limit=count
+        )
+        return ticket_with_messages(ticket, messages)
+
+
+async def main(args: argparse.Namespace) -> None:
+    field = create_model_field(name="Response_get_ticket", type_=TicketWithMessages)
+    try:
+        ticket_id = await seed(args.messages)
+
+        async def old():
+            with Timer() as load:
+                ticket = await entities(ticket_id)
+            with Timer() as render:
+                content = await serialize_response(field=field, response_content=ticket)
+                body = JSONResponse(content).body
+            return load.elapsed, render.elapsed, body
+
+        async def new():
+            with Timer() as load:
+                ticket = await rows(ticket_id, args.messages)
+            with Timer() as render:
+                body = ORJSONResponse(ticket).body
+            return load.elapsed, render.elapsed, body
+
+        bodies = {}
+        for name, path in (("entities + from_attributes", old), ("rows + orjson", new)):
+            await path()  # warm up
+            load_total = render_total = 0.0
+            for _ in range(args.rounds):
+                load, render, bodies[name] = await path()
+                load_total += load
+                render_total += render
+            print(
+                f"{name:<28} load_ms={load_total / args.rounds * 1000:.1f}"
+                f"  serialize_ms={render_total / args.rounds * 1000:.1f}"
+                f"  kib={len(bodies[name]) / 1024:.0f}"
+            )
+        old_body, new_body = bodies.values()
+        assert json.loads(old_body) == json.loads(new_body), "the two paths disagree"
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=10000)
+    parser.add_argument("--rounds", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,69 @@
+"""Compare per-token SSE framing with the coalescing encoder.
+
+    python -m benchmarks.sse_framing --tokens 500 --token-interval 0.002
+
+Runs in-process: a fake LLM stream emits tokens at a fixed cadence and each
+framing strategy's output is counted as the writes and bytes the response
+would send.
+"""
+import argparse
+import asyncio
+import os
+from typing import AsyncIterator, Dict
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://benchmark@localhost/benchmark")
+
+from benchmarks.common import Timer  # noqa: E402
+
+from app.core.sse import encode_stream  # noqa: E402
+
+
+async def tokens(count: int, interval: float) -> AsyncIterator[str]:
+    for i in range(count):
+        # Roughly one in ten deltas carries a line break, like list output.
+        yield f"token{i}\n" if i % 10 == 9 else f"token{i} "
+        await asyncio.sleep(interval)
+
+
+async def per_token(chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+    # What the endpoint used to do.
+    async for chunk in chunks:
+        yield f"data: {chunk}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+async def measure(stream: AsyncIterator[str]) -> Dict[str, float]:
+    writes = size = 0
+    with Timer() as timer:
+        async for frame in stream:
+            writes += 1
+            size += len(frame.encode())
+    return {"writes": writes, "bytes": size, "elapsed_s": timer.elapsed}
+
+
+async def main(args: argparse.Namespace) -> None:
+    runs = {
+        "per-token framing": per_token(tokens(args.tokens, args.token_interval)),
+        "coalescing encoder": encode_stream(
+            tokens(args.tokens, args.token_interval),
+            flush_interval=args.flush_interval,
+            flush_chars=args.flush_chars,
+        ),
+    }
+    for name, stream in runs.items():
+        result = await measure(stream)
+        print(
+            f"{name:<32} writes={result['writes']}  bytes={result['bytes']}  "
+            f"elapsed_s={result['elapsed_s']:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=500)
+    parser.add_argument("--token-interval", type=float, default=0.002)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    parser.add_argument("--flush-chars", type=int, default=1024)
+    asyncio.run(main(parser.parse_args()))
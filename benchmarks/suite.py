@@ -0,0 +1,369 @@
+"""Run the benchmark scenarios and compare them with a saved baseline.
+
+    python -m benchmarks.seed                      # once per database
+    python -m benchmarks.suite --save-baseline main
+    python -m benchmarks.suite --compare main
+
+Scenarios (all by default, or pick with --scenarios):
+
+    login_storm          concurrent POST /auth/login for the seeded users
+    ticket_list          GET /tickets/ as different users
+    ticket_detail_large  GET /tickets/{id} on the long conversation
+    ticket_messages_large  paging back through that conversation
+    ai_stream            concurrent GET /tickets/{id}/ai-response streams
+
+The app is served by uvicorn in this process, over real HTTP so streamed
+replies arrive as they are sent, with the mock LLM on BENCH_MOCK_LLM_PORT
+in front of it. Use --base-url to measure a separately started server
+instead; it must be pointed at the mock LLM and the seeded database.
+
+Each scenario reports throughput and p50/p95/p99 latency. `--save-baseline
+NAME` writes the results to benchmarks/baselines/NAME.json, to be committed
+with the change that moved them. `--compare NAME` prints the change in
+every metric and exits non-zero if p95, p99 or throughput got worse by more
+than --tolerance. See benchmarks/baselines/README.md for recording a first
+baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+MOCK_PORT = int(os.environ.get("BENCH_MOCK_LLM_PORT", "9000"))
+os.environ.setdefault("GROQ_BASE_URL", f"http://127.0.0.1:{MOCK_PORT}")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+# Every stream should reach the mock LLM, no user should be rate limited,
+# and nothing else should run in the background.
+os.environ.setdefault("AI_RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("AI_STREAM_RESUME_TTL_SECONDS", "0")
+os.environ.setdefault("AI_USER_GENERATIONS_PER_MINUTE", "1000000")
+os.environ.setdefault("AI_USER_GENERATION_BURST", "1000000")
+os.environ.setdefault("AI_JOB_INPROCESS_WORKERS", "0")
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+from benchmarks.common import Timer, print_summary, summarize  # noqa: E402
+from benchmarks.mock_llm import start_mock_llm  # noqa: E402
+from benchmarks.seed import DEFAULT_MANIFEST  # noqa: E402
+
+from app.core.config import settings  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.db.base import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+# Metrics that fail --compare, and whether a higher value is better.
+GATED_METRICS = {"throughput_rps": True, "p95_ms": False, "p99_ms": False}
+REPORTED_METRICS = ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+
+Scenario = Callable[["Context"], Awaitable[Dict[str, Dict[str, float]]]]
+
+
+class Context:
+    def __init__(
+        self, client: httpx.AsyncClient, manifest: Dict[str, Any], args: argparse.Namespace
+    ):
+        self.client = client
+        self.manifest = manifest
+        self.args = args
+        self._headers: Dict[str, Dict[str, str]] = {}
+
+    def auth(self, user_id: str) -> Dict[str, str]:
+        # Tokens are minted directly so only login_storm pays for bcrypt.
+        if user_id not in self._headers:
+            token = create_access_token(user_id)
+            self._headers[user_id] = {"Authorization": f"Bearer {token}"}
+        return self._headers[user_id]
+
+
+async def run_concurrently(
+    call: Callable[[int], Awaitable[None]], requests: int, concurrency: int
+) -> Tuple[List[float], int, float]:
+    """Make `requests` calls, at most `concurrency` at a time.
+
+    Returns the latencies of the successful calls, the number that failed
+    and the wall-clock time.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(i: int) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await call(i)
+            except (httpx.HTTPError, ValueError):
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    with Timer() as timer:
+        await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, errors, timer.elapsed
+
+
+def report(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    return {**summarize(latencies, elapsed), "errors": errors}
+
+
+async def measure(
+    ctx: Context, call: Callable[[int], Awaitable[None]], requests: int
+) -> Dict[str, float]:
+    return report(*await run_concurrently(call, requests, ctx.args.concurrency))
+
+
+async def login_storm(ctx: Context) -> Dict[str, Dict[str, float]]:
+    users = ctx.manifest["users"]
+
+    async def login(i: int) -> None:
+        response = await ctx.client.post(
+            "/auth/login",
+            data={
+                "username": users[i % len(users)]["email"],
+                "password": ctx.manifest["password"],
+            },
+        )
+        response.raise_for_status()
+
+    return {"login_storm": await measure(ctx, login, ctx.args.logins)}
+
+
+async def ticket_list(ctx: Context) -> Dict[str, Dict[str, float]]:
+    users = ctx.manifest["users"]
+
+    async def list_tickets(i: int) -> None:
+        response = await ctx.client.get(
+            "/tickets/", params={"limit": 50}, headers=ctx.auth(users[i % len(users)]["id"])
+        )
+        response.raise_for_status()
+
+    return {"ticket_list": await measure(ctx, list_tickets, ctx.args.requests)}
+
+
+async def ticket_detail_large(ctx: Context) -> Dict[str, Dict[str, float]]:
+    ticket = ctx.manifest["large_ticket"]
+    headers = ctx.auth(ticket["user_id"])
+
+    async def detail(i: int) -> None:
+        response = await ctx.client.get(f"/tickets/{ticket['id']}", headers=headers)
+        response.raise_for_status()
+
+    return {"ticket_detail_large": await measure(ctx, detail, ctx.args.requests)}
+
+
+async def ticket_messages_large(ctx: Context) -> Dict[str, Dict[str, float]]:
+    ticket = ctx.manifest["large_ticket"]
+    headers = ctx.auth(ticket["user_id"])
+
+    async def walk(i: int) -> None:
+        cursor = None
+        for _ in range(ctx.args.pages):
+            params = {"limit": 100}
+            if cursor:
+                params["cursor"] = cursor
+            response = await ctx.client.get(
+                f"/tickets/{ticket['id']}/messages", params=params, headers=headers
+            )
+            response.raise_for_status()
+            cursor = response.headers.get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+    requests = max(1, ctx.args.requests // ctx.args.pages)
+    return {"ticket_messages_large": await measure(ctx, walk, requests)}
+
+
+async def ai_stream(ctx: Context) -> Dict[str, Dict[str, float]]:
+    # Distinct tickets where there are enough, so each stream is its own
+    # generation rather than joining another one.
+    tickets = ctx.manifest["tickets"]
+    first_events: List[float] = []
+
+    async def stream(i: int) -> None:
+        ticket = tickets[i % len(tickets)]
+        started = time.perf_counter()
+        async with ctx.client.stream(
+            "GET",
+            f"/tickets/{ticket['id']}/ai-response",
+            headers=ctx.auth(ticket["user_id"]),
+        ) as response:
+            response.raise_for_status()
+            first_event = None
+            async for line in response.aiter_lines():
+                if first_event is None and line.startswith("data:"):
+                    first_event = time.perf_counter() - started
+            if first_event is None:
+                raise ValueError("Stream ended without any events")
+            first_events.append(first_event)
+
+    latencies, errors, elapsed = await run_concurrently(
+        stream, ctx.args.streams, ctx.args.stream_concurrency
+    )
+    return {
+        "ai_stream": report(latencies, errors, elapsed),
+        "ai_stream_first_event": report(first_events, errors, elapsed),
+    }
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "login_storm": login_storm,
+    "ticket_list": ticket_list,
+    "ticket_detail_large": ticket_detail_large,
+    "ticket_messages_large": ticket_messages_large,
+    "ai_stream": ai_stream,
+}
+
+
+def compare(
+    baseline: Dict[str, Any], results: Dict[str, Dict[str, float]], tolerance: float
+) -> bool:
+    """Print each metric against the baseline; True if nothing regressed."""
+    ok = True
+    for scenario, summary in results.items():
+        previous = baseline["results"].get(scenario)
+        if previous is None:
+            print(f"{scenario:<28} (not in baseline)")
+            continue
+        for metric in REPORTED_METRICS:
+            before, after = previous.get(metric), summary.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            flag = ""
+            if metric in GATED_METRICS:
+                higher_is_better = GATED_METRICS[metric]
+                if (change < -tolerance) if higher_is_better else (change > tolerance):
+                    flag = "  REGRESSION"
+                    ok = False
+            print(
+                f"{scenario:<28} {metric:<15} {before:>10.2f} -> {after:>10.2f}"
+                f"  {change:+7.1%}{flag}"
+            )
+    return ok
+
+
+async def start_server(port: int) -> Tuple[uvicorn.Server, asyncio.Task]:
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def main(args: argparse.Namespace) -> int:
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    scenarios = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    # Checked before the run rather than after it.
+    baseline = None
+    if args.compare:
+        path = os.path.join(BASELINE_DIR, f"{args.compare}.json")
+        if not os.path.exists(path):
+            raise SystemExit(
+                f"No baseline at {path}; record one with --save-baseline "
+                "(see benchmarks/baselines/README.md)"
+            )
+        with open(path) as f:
+            baseline = json.load(f)
+
+    mock_llm = await start_mock_llm(
+        port=MOCK_PORT,
+        latency=args.llm_latency,
+        token_rate=args.llm_token_rate,
+        tokens=args.llm_tokens,
+    )
+    server = task = None
+    if args.base_url:
+        base_url = args.base_url
+    else:
+        server, task = await start_server(args.port)
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    results: Dict[str, Dict[str, float]] = {}
+    limits = httpx.Limits(max_connections=max(args.concurrency, args.stream_concurrency))
+    try:
+        async with httpx.AsyncClient(
+            base_url=f"{base_url}{settings.API_V1_STR}", limits=limits, timeout=None
+        ) as client:
+            ctx = Context(client, manifest, args)
+            # One request first, so connection setup is not in any scenario.
+            await client.get("/tickets/", headers=ctx.auth(manifest["users"][0]["id"]))
+            for name in scenarios:
+                for key, summary in (await SCENARIOS[name](ctx)).items():
+                    results[key] = summary
+                    print_summary(key, summary)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await task
+        await mock_llm.cleanup()
+        await engine.dispose()
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        path = os.path.join(BASELINE_DIR, f"{args.save_baseline}.json")
+        saved = {
+            "name": args.save_baseline,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "database": engine.dialect.name,
+                "server": args.base_url or "in-process uvicorn",
+            },
+            "dataset": manifest["counts"],
+            "params": {
+                key: value
+                for key, value in vars(args).items()
+                if key not in ("manifest", "save_baseline", "compare", "base_url")
+            },
+            "results": results,
+        }
+        with open(path, "w") as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"wrote {path}")
+
+    if baseline is not None:
+        if baseline.get("dataset") != manifest["counts"]:
+            print("warning: the seeded dataset differs from the baseline's")
+        if not compare(baseline, results, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--scenarios", help="comma-separated; default all")
+    parser.add_argument("--base-url", help="measure a running server instead")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--streams", type=int, default=100)
+    parser.add_argument("--stream-concurrency", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--llm-token-rate", type=float, default=200.0)
+    parser.add_argument("--llm-tokens", type=int, default=50)
+    parser.add_argument("--save-baseline", metavar="NAME")
+    parser.add_argument("--compare", metavar="NAME")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,13 @@
+import os
+
+# Settings are read at import time; the unit tests never connect anywhere.
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ.setdefault("DATABASE_URL", "postgresql+asyncpg://test@localhost/test")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
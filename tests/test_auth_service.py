@@ -0,0 +1,39 @@
+import pytest
+
+from app.api.schemas.user import UserCreate
+from app.services.auth_service import AuthService
+
+
+class FakeUserRepository:
+    def __init__(self):
+        self.created = []
+
+    async def get_by_email(self, email):
+        return None
+
+    async def create(self, *, obj_in):
+        self.created.append(obj_in)
+        return obj_in
+
+
+@pytest.mark.anyio
+async def test_register_ignores_client_supplied_role():
+    repository = FakeUserRepository()
+    user_in = UserCreate(email="new@example.com", password="password123", role="admin")
+
+    await AuthService(repository).register_new_user(user_in)
+
+    (created,) = repository.created
+    assert created["role"] == "user"
+    assert "password" not in created
+    assert created["hashed_password"] != "password123"
+
+
+@pytest.mark.anyio
+async def test_register_defaults_role_to_user():
+    repository = FakeUserRepository()
+    user_in = UserCreate(email="new@example.com", password="password123")
+
+    await AuthService(repository).register_new_user(user_in)
+
+    assert repository.created[0]["role"] == "user"
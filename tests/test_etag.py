@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.etag import etag_matches, make_etag
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag("ticket", 1, "2026-10-17")
+
+    assert etag.startswith('W/"') and etag.endswith('"')
+    assert make_etag("ticket", 1, "2026-10-17") == etag
+    assert make_etag("ticket", 2, "2026-10-17") != etag
+
+
+@pytest.mark.parametrize(
+    "if_none_match, expected",
+    [
+        (None, False),
+        ("", False),
+        ("*", True),
+        (" * ", True),
+        ('W/"abc"', True),
+        ('"abc"', True),
+        ('"other", W/"abc"', True),
+        ('"other"', False),
+        ('W/"abcd"', False),
+    ],
+)
+def test_etag_matches(if_none_match, expected):
+    assert etag_matches(if_none_match, 'W/"abc"') is expected
+
+
+def test_etag_matches_strong_etag():
+    assert etag_matches('W/"abc"', '"abc"')
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.generation_scheduler import parse_retry_after
+
+
+@pytest.mark.parametrize(
+    "headers, expected",
+    [
+        ({"retry-after": "3"}, 3.0),
+        ({"retry-after": "1.5"}, 1.5),
+        ({"retry-after": "-2"}, 0.0),
+        ({"x-ratelimit-reset-requests": "7.66s"}, 7.66),
+        ({"x-ratelimit-reset-tokens": "2m59.56s"}, 179.56),
+        ({"x-ratelimit-reset-tokens": "1h2m"}, 3720.0),
+        ({"x-ratelimit-reset-tokens": "250ms"}, 0.25),
+        (
+            {"x-ratelimit-reset-requests": "2s", "x-ratelimit-reset-tokens": "1m"},
+            60.0,
+        ),
+        # An HTTP date is not understood; the reset headers are used instead.
+        (
+            {
+                "retry-after": "Fri, 16 Oct 2026 07:28:00 GMT",
+                "x-ratelimit-reset-tokens": "4s",
+            },
+            4.0,
+        ),
+        ({"retry-after": "2", "x-ratelimit-reset-tokens": "1m"}, 2.0),
+    ],
+)
+def test_parse_retry_after(headers, expected):
+    assert parse_retry_after(headers) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [{}, {"retry-after": ""}, {"retry-after": "soon"}, {"content-type": "text/plain"}],
+)
+def test_parse_retry_after_without_a_delay(headers):
+    assert parse_retry_after(headers) is None
@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+from app.core.exceptions import InvalidCursorException
+from app.core.pagination import (
+    _encode,
+    decode_cursor,
+    decode_rank_cursor,
+    encode_cursor,
+    encode_rank_cursor,
+)
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 12, 30, 5, 123456)
+    id = uuid.uuid4()
+
+    cursor = encode_cursor(created_at, id)
+
+    assert decode_cursor(cursor) == (created_at, id)
+
+
+def test_cursor_keeps_timezone():
+    created_at = datetime(2026, 10, 17, 12, 30, tzinfo=timezone.utc)
+    id = uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(created_at, id)) == (created_at, id)
+
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor(datetime(2026, 10, 17), uuid.uuid4())
+
+    assert "=" not in cursor
+    assert "+" not in cursor
+    assert "/" not in cursor
+
+
+def test_rank_cursor_round_trip():
+    id = uuid.uuid4()
+
+    assert decode_rank_cursor(encode_rank_cursor(0.0607927, id)) == (0.0607927, id)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "",
+        "not a cursor",
+        "!!!!",
+        _encode([]),
+        _encode(["2026-10-17T00:00:00"]),
+        _encode(["yesterday", str(uuid.uuid4())]),
+        _encode(["2026-10-17T00:00:00", "not-a-uuid"]),
+        _encode(["2026-10-17T00:00:00", None]),
+        _encode({"created_at": 1}),
+    ],
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    ["not a cursor", _encode(["high", str(uuid.uuid4())]), _encode([1.0])],
+)
+def test_invalid_rank_cursor(cursor):
+    with pytest.raises(InvalidCursorException):
+        decode_rank_cursor(cursor)
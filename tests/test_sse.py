@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.core.sse import encode_stream, format_comment, format_event
+
+
+async def source(*chunks, delay=0.0):
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+def test_format_event():
+    assert format_event("hello") == "data: hello\n\n"
+    assert format_event("hi", id="2", event="reply") == "event: reply\nid: 2\ndata: hi\n\n"
+
+
+def test_format_event_splits_lines():
+    assert format_event("a\nb\r\nc\rd") == "data: a\ndata: b\ndata: c\ndata: d\n\n"
+    assert format_event("a\n") == "data: a\ndata: \n\n"
+
+
+def test_format_comment():
+    assert format_comment("ping") == ": ping\n\n"
+
+
+@pytest.mark.anyio
+async def test_encode_stream_coalesces_chunks():
+    events = await collect(
+        encode_stream(source("Hel", "lo", " there"), flush_interval=1, flush_chars=100)
+    )
+
+    assert events == [format_event("Hello there", id="11"), format_event("[DONE]")]
+
+
+@pytest.mark.anyio
+async def test_encode_stream_flushes_at_flush_chars():
+    events = await collect(
+        encode_stream(
+            source("ab", "cd", "ef"), flush_interval=1, flush_chars=4, done=None
+        )
+    )
+
+    assert events == [format_event("abcd", id="4"), format_event("ef", id="6")]
+
+
+@pytest.mark.anyio
+async def test_encode_stream_ids_count_from_offset():
+    events = await collect(
+        encode_stream(
+            source("abc"), offset=10, flush_interval=0, flush_chars=100, done=None
+        )
+    )
+
+    assert events == [format_event("abc", id="13")]
+
+
+@pytest.mark.anyio
+async def test_encode_stream_sends_heartbeats_while_idle():
+    events = await collect(
+        encode_stream(
+            source("late", delay=0.2),
+            flush_interval=0,
+            heartbeat_interval=0.05,
+            done=None,
+        )
+    )
+
+    assert events[0] == format_comment("ping")
+    assert events[-1] == format_event("late", id="4")
+    assert set(events[:-1]) == {format_comment("ping")}
+
+
+@pytest.mark.anyio
+async def test_encode_stream_flushes_before_raising():
+    async def failing():
+        yield "partial"
+        raise RuntimeError("upstream failed")
+
+    events = []
+    with pytest.raises(RuntimeError, match="upstream failed"):
+        async for event in encode_stream(failing(), flush_interval=1, flush_chars=100):
+            events.append(event)
+
+    assert events == [format_event("partial", id="7")]
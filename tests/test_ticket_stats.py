@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.db.repositories.ticket_stats_repository import (
+    FIRST_RESPONSE_BUCKETS,
+    first_response_bucket,
+)
+
+CREATED_AT = datetime(2026, 10, 17, 12, 0)
+
+
+@pytest.mark.parametrize(
+    "seconds, bucket",
+    [
+        (0, 0),
+        (9.9, 0),
+        (10, 1),
+        (59, 2),
+        (3600, 6),
+        (24 * 3600 - 1, 7),
+        (24 * 3600, len(FIRST_RESPONSE_BUCKETS)),
+        (30 * 24 * 3600, len(FIRST_RESPONSE_BUCKETS)),
+    ],
+)
+def test_first_response_bucket(seconds, bucket):
+    responded_at = CREATED_AT + timedelta(seconds=seconds)
+
+    assert first_response_bucket(CREATED_AT, responded_at) == bucket
+
+
+def test_first_response_bucket_mixes_naive_and_aware():
+    # Columns hold naive UTC; a fresh value from Python may be aware.
+    responded_at = CREATED_AT.replace(tzinfo=timezone.utc) + timedelta(seconds=45)
+
+    assert first_response_bucket(CREATED_AT, responded_at) == 2